@@ -16,8 +16,15 @@ Modos de uso:
        python csv_para_word.py --arquivo resultados/tabelas/top_20_apps.csv
 """
 
+from __future__ import annotations
+
 import argparse
+import copy
+import csv
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 
@@ -29,6 +36,15 @@ from docx.enum.table import WD_TABLE_ALIGNMENT
 from docx.oxml.ns import qn
 from docx.oxml import OxmlElement
 
+try:                                    # leitor CSV multithread (opcional)
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    from src.leitura_csv import abrir_csv_arrow
+except ImportError:
+    pacsv = None
+
+from src.documento import add_paragrafos, salvar_docx
+
 # ── caminhos ──────────────────────────────────────────────────────────────────
 ROOT_DIR    = Path(__file__).resolve().parent
 TABELAS_DIR = ROOT_DIR / "resultados" / "tabelas"
@@ -63,34 +79,76 @@ ORDEM = [
     "reviews_anotados.csv",
 ]
 
+# Linhas exibidas por tabela (o restante do CSV nem chega a ser carregado)
+MAX_LINHAS_TABELA = 500
+
 
 # ════════════════════════════════════════════════════════════════════════════
 # UTILITÁRIOS DE FORMATAÇÃO
 # ════════════════════════════════════════════════════════════════════════════
 
-def _set_doc_margins(doc: Document, margin_cm: float = 2.5):
+# ── constantes de formatação (objetos imutáveis, criados uma única vez) ──
+_MARGEM      = Cm(2.5)
+_AZUL_ESCURO = RGBColor(0x1A, 0x23, 0x7E)
+_pt          = lru_cache(maxsize=None)(Pt)     # Pt(n) memoizado
+
+
+def _set_doc_margins(doc: Document, margem=_MARGEM):
     """Define margens do documento."""
     for section in doc.sections:
-        section.top_margin    = Cm(margin_cm)
-        section.bottom_margin = Cm(margin_cm)
-        section.left_margin   = Cm(margin_cm)
-        section.right_margin  = Cm(margin_cm)
+        section.top_margin = section.bottom_margin = margem
+        section.left_margin = section.right_margin = margem
 
 
-def _shade_cell(cell, fill: str):
-    """Aplica cor de fundo (hex sem #) em uma célula."""
-    tc_pr = cell._tc.get_or_add_tcPr()
+def _novo_shd(fill: str):
+    """Cria um elemento <w:shd> com a cor de fundo (hex sem #)."""
     shd = OxmlElement("w:shd")
     shd.set(qn("w:val"), "clear")
     shd.set(qn("w:color"), "auto")
     shd.set(qn("w:fill"), fill)
-    tc_pr.append(shd)
+    return shd
+
+
+# protótipos de sombreamento, copiados para cada célula
+_SHD_CABECALHO = _novo_shd("1A237E")     # azul escuro
+_SHD_PAR       = _novo_shd("E8EAF6")     # zebra
+_SHD_IMPAR     = _novo_shd("FFFFFF")
+
+
+def _shade_cell(cell, shd) -> None:
+    """Aplica em uma célula uma cópia do protótipo <w:shd> informado."""
+    cell._tc.get_or_add_tcPr().append(copy.deepcopy(shd))
+
+
+def _novo_rpr(size_pt: int, bold: bool = False, color: str | None = None):
+    """Cria um elemento <w:rPr> (negrito, cor hex sem #, tamanho em pt)."""
+    rpr = OxmlElement("w:rPr")
+    if bold:
+        rpr.append(OxmlElement("w:b"))
+    if color:
+        cor = OxmlElement("w:color")
+        cor.set(qn("w:val"), color)
+        rpr.append(cor)
+    sz = OxmlElement("w:sz")
+    sz.set(qn("w:val"), str(size_pt * 2))       # meios-pontos
+    rpr.append(sz)
+    return rpr
+
+
+# protótipos de formatação de texto das células
+_RPR_CABECALHO = _novo_rpr(9, bold=True, color="FFFFFF")   # branco, negrito
+_RPR_DADOS     = _novo_rpr(8)
+
+
+def _run_formatado(run_el, rpr) -> None:
+    """Aplica a um <w:r> uma cópia do protótipo <w:rPr> informado."""
+    run_el.insert(0, copy.deepcopy(rpr))
 
 
 def _add_heading(doc: Document, text: str, level: int = 1):
     h = doc.add_heading(text, level=level)
     for run in h.runs:
-        run.font.color.rgb = RGBColor(0x1A, 0x23, 0x7E)
+        run.font.color.rgb = _AZUL_ESCURO
     return h
 
 
@@ -101,10 +159,11 @@ def _add_paragraph(doc: Document, text: str, bold: bool = False, italic: bool =
     run = p.add_run(text)
     run.bold = bold
     run.italic = italic
-    run.font.size = Pt(size)
-    p.paragraph_format.space_after = Pt(6)
+    run.font.size = _pt(size)
+    p.paragraph_format.space_after = _pt(6)
 
 
+@lru_cache(maxsize=None)
 def _titulo_amigavel(nome_arquivo: str) -> str:
     """Retorna título legível para o CSV, ou converte o nome automaticamente."""
     if nome_arquivo in TITULOS:
@@ -113,12 +172,85 @@ def _titulo_amigavel(nome_arquivo: str) -> str:
     return nome_arquivo.replace(".csv", "").replace("_", " ").title()
 
 
+# ════════════════════════════════════════════════════════════════════════════
+# LEITURA DE CSV (com cache)
+# ════════════════════════════════════════════════════════════════════════════
+
+def _contar_linhas(caminho: str) -> int:
+    """Conta as linhas de dados do CSV sem montar DataFrame."""
+    with open(caminho, encoding="utf-8-sig", newline="") as f:
+        return sum(1 for linha in csv.reader(f) if linha) - 1
+
+
+def _ler_csv_texto(caminho: str, nrows: int | None) -> tuple[pd.DataFrame, int]:
+    """Lê o CSV com PyArrow mantendo todas as colunas como texto.
+
+    Nas tabelas Word os valores só aparecem como texto; lê-los como string evita
+    a inferência de tipos do Arrow (datas, arredondamento de floats) e preserva
+    exatamente o conteúdo gravado pelo pipeline. Os lotes além de `nrows` são
+    apenas contados.
+    """
+    with open(caminho, encoding="utf-8-sig", newline="") as f:
+        cabecalho = next(csv.reader(f), [])
+    nomes = [f"c{i}" for i in range(len(cabecalho))]
+    leitor = abrir_csv_arrow(
+        caminho,
+        read_options=pacsv.ReadOptions(column_names=nomes, skip_rows=1),
+        convert_options=pacsv.ConvertOptions(
+            column_types=dict.fromkeys(nomes, pa.string())),
+    )
+    lotes, total = [], 0
+    for lote in leitor:
+        if nrows is None or total < nrows:
+            lotes.append(lote)
+        total += lote.num_rows
+    tabela = pa.Table.from_batches(lotes, schema=leitor.schema)
+    if nrows is not None:
+        tabela = tabela.slice(0, nrows)
+    df = tabela.to_pandas()
+    # mesmo nome que o pandas dá a colunas sem cabeçalho (ex.: índice salvo)
+    df.columns = [c or f"Unnamed: {i}" for i, c in enumerate(cabecalho)]
+    return df, total
+
+
+@lru_cache(maxsize=64)
+def _ler_csv_cache(caminho: str, mtime_ns: int, tamanho: int,
+                   nrows: int | None) -> tuple[pd.DataFrame, int]:
+    """Lê o CSV; a chave inclui mtime e tamanho para invalidar após edições."""
+    if pacsv is not None:
+        return _ler_csv_texto(caminho, nrows)
+    # tudo como texto, igual ao caminho Arrow: o .docx não pode variar
+    # conforme o pyarrow esteja instalado ou não
+    df = pd.read_csv(caminho, encoding="utf-8-sig", nrows=nrows,
+                     dtype=str, keep_default_na=False)
+    total = len(df)
+    if nrows is not None and total == nrows:      # pode haver mais linhas
+        total = _contar_linhas(caminho)
+    return df, total
+
+
+def _ler_csv(csv_path: Path, nrows: int | None = None) -> tuple[pd.DataFrame, int]:
+    """Retorna (DataFrame com até `nrows` linhas, total de linhas do arquivo).
+
+    Leituras anteriores do mesmo arquivo são reaproveitadas; o DataFrame é
+    compartilhado entre chamadas — não deve ser alterado in-place.
+    """
+    st = csv_path.stat()                # stat novo: o CSV pode ter sido regravado
+    return _ler_csv_cache(str(csv_path), st.st_mtime_ns, st.st_size, nrows)
+
+
 # ════════════════════════════════════════════════════════════════════════════
 # INSERÇÃO DE TABELA CSV
 # ════════════════════════════════════════════════════════════════════════════
 
-def _inserir_tabela(doc: Document, df: pd.DataFrame, max_rows: int = 500) -> None:
-    """Insere DataFrame como tabela Word formatada."""
+def _inserir_tabela(doc: Document, df: pd.DataFrame, max_rows: int = MAX_LINHAS_TABELA,
+                    total: int | None = None) -> None:
+    """Insere DataFrame como tabela Word formatada.
+
+    `total` é o número de linhas do CSV de origem quando `df` já vem truncado.
+    """
+    if total is None:
+        total = len(df)
     df = df.head(max_rows).reset_index(drop=True)
 
     if df.empty:
@@ -130,36 +262,43 @@ def _inserir_tabela(doc: Document, df: pd.DataFrame, max_rows: int = 500) -> Non
     table.alignment = WD_TABLE_ALIGNMENT.CENTER
 
     # ── cabeçalho ──────────────────────────────────────────────────────────
-    hdr_cells = table.rows[0].cells
-    for i, col in enumerate(df.columns):
-        cell = hdr_cells[i]
+    for cell, col in zip(table.rows[0].cells, df.columns):
         cell.text = str(col)
-        _shade_cell(cell, "1A237E")          # azul escuro
-        for par in cell.paragraphs:
-            for run in par.runs:
-                run.bold = True
-                run.font.size = Pt(9)
-                run.font.color.rgb = RGBColor(0xFF, 0xFF, 0xFF)  # branco
-            par.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        _shade_cell(cell, _SHD_CABECALHO)
+        par = cell.paragraphs[0]
+        par.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        _run_formatado(par.runs[0]._r, _RPR_CABECALHO)
 
     # ── linhas de dados ────────────────────────────────────────────────────
-    for idx, (_, row) in enumerate(df.iterrows()):
-        cells = table.add_row().cells
-        fill = "E8EAF6" if idx % 2 == 0 else "FFFFFF"   # zebra
-        for i, val in enumerate(row):
-            cell = cells[i]
-            cell.text = "" if pd.isna(val) else str(val)
-            _shade_cell(cell, fill)
-            for par in cell.paragraphs:
-                for run in par.runs:
-                    run.font.size = Pt(8)
+    # texto de todas as células (NaN → "") numa única passada vetorizada
+    valores = df.fillna("").astype(str).to_numpy()
+
+    # linhas-modelo (zebra) formatadas uma única vez; as linhas de dados são
+    # cópias do seu <w:tr>, anexadas à tabela de uma só vez
+    tbl = table._tbl
+    modelos = []
+    for shd in (_SHD_PAR, _SHD_IMPAR):
+        modelo = table.add_row()
+        for cell in modelo.cells:
+            _shade_cell(cell, shd)
+            _run_formatado(cell.paragraphs[0].add_run()._r, _RPR_DADOS)
+        tbl.remove(modelo._tr)
+        modelos.append(modelo._tr)
+
+    linhas = []
+    for idx, row in enumerate(valores):
+        tr = copy.deepcopy(modelos[idx % 2])
+        for run, val in zip(tr.iter(qn("w:r")), row):
+            if val:                 # célula vazia: o run do modelo já está vazio
+                run.text = val
+        linhas.append(tr)
+    tbl.extend(linhas)
 
     # legenda de linhas truncadas
-    total = len(df)
-    if total == max_rows:
+    if total > max_rows:
         doc.add_paragraph()
         _add_paragraph(doc,
-            f"* Tabela limitada a {max_rows} linhas por legibilidade.",
+            f"* Tabela limitada a {max_rows} de {total} linhas por legibilidade.",
             italic=True, size=9)
 
 
@@ -167,11 +306,11 @@ def _inserir_tabela(doc: Document, df: pd.DataFrame, max_rows: int = 500) -> Non
 # CAPA E RODAPÉ
 # ════════════════════════════════════════════════════════════════════════════
 
-def _gerar_capa(doc: Document, titulo_doc: str) -> None:
+def _gerar_capa(doc: Document, titulo_doc: str, agora: datetime | None = None) -> None:
     _set_doc_margins(doc)
     style = doc.styles["Normal"]
     style.font.name = "Calibri"
-    style.font.size = Pt(11)
+    style.font.size = _pt(11)
 
     for _ in range(5):
         doc.add_paragraph()
@@ -180,8 +319,8 @@ def _gerar_capa(doc: Document, titulo_doc: str) -> None:
     t.alignment = WD_ALIGN_PARAGRAPH.CENTER
     run = t.add_run(titulo_doc)
     run.bold = True
-    run.font.size = Pt(20)
-    run.font.color.rgb = RGBColor(0x1A, 0x23, 0x7E)
+    run.font.size = _pt(20)
+    run.font.color.rgb = _AZUL_ESCURO
 
     doc.add_paragraph()
     sub = doc.add_paragraph()
@@ -189,14 +328,15 @@ def _gerar_capa(doc: Document, titulo_doc: str) -> None:
     r = sub.add_run(
         "Sistemas de Informação em Saúde — Análise mHealth via Google Play Store")
     r.italic = True
-    r.font.size = Pt(13)
+    r.font.size = _pt(13)
 
     for _ in range(6):
         doc.add_paragraph()
 
     data = doc.add_paragraph()
     data.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    data.add_run(f"Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M')}").font.size = Pt(11)
+    agora = agora or datetime.now()
+    data.add_run(f"Gerado em: {agora:%d/%m/%Y %H:%M}").font.size = _pt(11)
 
     doc.add_page_break()
 
@@ -208,36 +348,38 @@ def _gerar_capa(doc: Document, titulo_doc: str) -> None:
 def gerar_documento_unico(csvs: list[Path]) -> Path:
     """Gera um único .docx com todas as tabelas CSV."""
     doc = Document()
-    _gerar_capa(doc, "TABELAS DE RESULTADOS\nSISTEMAS DE INFORMAÇÃO EM SAÚDE / mHEALTH")
+    agora = datetime.now()
+    _gerar_capa(doc, "TABELAS DE RESULTADOS\nSISTEMAS DE INFORMAÇÃO EM SAÚDE / mHEALTH", agora)
 
     # sumário automático
     _add_heading(doc, "ÍNDICE DE TABELAS", 1)
-    for i, csv in enumerate(csvs, 1):
-        doc.add_paragraph(f"{i}. {_titulo_amigavel(csv.name)}")
+    add_paragrafos(doc, [f"{i}. {_titulo_amigavel(csv_path.name)}"
+                          for i, csv_path in enumerate(csvs, 1)])
     doc.add_page_break()
 
+    n_csvs = len(csvs)
     for i, csv_path in enumerate(csvs, 1):
         titulo = _titulo_amigavel(csv_path.name)
-        print(f"  [{i}/{len(csvs)}] {titulo} ← {csv_path.name}")
+        print(f"  [{i}/{n_csvs}] {titulo} ← {csv_path.name}")
 
         _add_heading(doc, f"Tabela {i} — {titulo}", 1)
         _add_paragraph(doc, f"Arquivo de origem: {csv_path.name}", italic=True, size=9)
         doc.add_paragraph()
 
         try:
-            df = pd.read_csv(csv_path, encoding="utf-8-sig")
+            df, n_linhas = _ler_csv(csv_path, nrows=MAX_LINHAS_TABELA)
             _add_paragraph(doc,
-                f"{len(df)} linha(s) × {len(df.columns)} coluna(s)",
+                f"{n_linhas} linha(s) × {len(df.columns)} coluna(s)",
                 size=9, italic=True)
             doc.add_paragraph()
-            _inserir_tabela(doc, df)
+            _inserir_tabela(doc, df, total=n_linhas)
         except Exception as exc:
             _add_paragraph(doc, f"[Erro ao ler arquivo: {exc}]", italic=True)
 
         doc.add_page_break()
 
-    nome_saida = SAIDA_DIR / f"todas_tabelas_{datetime.now():%Y%m%d_%H%M%S}.docx"
-    doc.save(str(nome_saida))
+    nome_saida = SAIDA_DIR / f"todas_tabelas_{agora:%Y%m%d_%H%M%S}.docx"
+    salvar_docx(doc, nome_saida)
     return nome_saida
 
 
@@ -245,37 +387,52 @@ def gerar_documento_unico(csvs: list[Path]) -> Path:
 # DOCUMENTOS SEPARADOS (um por CSV)
 # ════════════════════════════════════════════════════════════════════════════
 
-def gerar_documentos_separados(csvs: list[Path]) -> list[Path]:
-    """Gera um .docx independente para cada CSV."""
-    saidas = []
-    for csv_path in csvs:
-        titulo = _titulo_amigavel(csv_path.name)
-        print(f"  → {titulo}")
+def _gerar_documento_csv(csv_path: Path) -> Path:
+    """Gera o .docx de um único CSV (executado em processo separado)."""
+    titulo = _titulo_amigavel(csv_path.name)
 
-        doc = Document()
-        _gerar_capa(doc, titulo)
-        _set_doc_margins(doc)
+    doc = Document()
+    _gerar_capa(doc, titulo)            # já define as margens
 
-        _add_heading(doc, titulo, 1)
-        _add_paragraph(doc, f"Arquivo de origem: {csv_path.name}", italic=True, size=9)
+    _add_heading(doc, titulo, 1)
+    _add_paragraph(doc, f"Arquivo de origem: {csv_path.name}", italic=True, size=9)
+    doc.add_paragraph()
+
+    try:
+        df, n_linhas = _ler_csv(csv_path, nrows=MAX_LINHAS_TABELA)
+        _add_paragraph(doc,
+            f"{n_linhas} linha(s) × {len(df.columns)} coluna(s)",
+            size=9, italic=True)
         doc.add_paragraph()
+        _inserir_tabela(doc, df, total=n_linhas)
+    except Exception as exc:
+        _add_paragraph(doc, f"[Erro ao ler arquivo: {exc}]", italic=True)
 
-        try:
-            df = pd.read_csv(csv_path, encoding="utf-8-sig")
-            _add_paragraph(doc,
-                f"{len(df)} linha(s) × {len(df.columns)} coluna(s)",
-                size=9, italic=True)
-            doc.add_paragraph()
-            _inserir_tabela(doc, df)
-        except Exception as exc:
-            _add_paragraph(doc, f"[Erro ao ler arquivo: {exc}]", italic=True)
+    stem = csv_path.stem
+    nome_saida = SAIDA_DIR / f"{stem}.docx"
+    salvar_docx(doc, nome_saida)
+    return nome_saida
+
+
+def _anunciar(csvs: list[Path], saidas) -> list[Path]:
+    """Consome as saídas em ordem, imprimindo o título de cada documento."""
+    prontas = []
+    for csv_path, saida in zip(csvs, saidas):
+        print(f"  → {_titulo_amigavel(csv_path.name)}")
+        prontas.append(saida)
+    return prontas
 
-        stem = csv_path.stem
-        nome_saida = SAIDA_DIR / f"{stem}.docx"
-        doc.save(str(nome_saida))
-        saidas.append(nome_saida)
 
-    return saidas
+def gerar_documentos_separados(csvs: list[Path]) -> list[Path]:
+    """Gera um .docx independente para cada CSV, em paralelo.
+
+    Processos, não threads: montar os objetos do python-docx/lxml segura o
+    GIL. O progresso é impresso pelo processo principal, na ordem dos CSVs.
+    """
+    if len(csvs) <= 1:                  # --arquivo: sem custo de subir o pool
+        return _anunciar(csvs, map(_gerar_documento_csv, csvs))
+    with ProcessPoolExecutor(max_workers=min(len(csvs), os.cpu_count() or 1)) as ex:
+        return _anunciar(csvs, ex.map(_gerar_documento_csv, csvs))
 
 
 # ════════════════════════════════════════════════════════════════════════════
@@ -283,8 +440,13 @@ def gerar_documentos_separados(csvs: list[Path]) -> list[Path]:
 # ════════════════════════════════════════════════════════════════════════════
 
 def _coletar_csvs(pasta: Path) -> list[Path]:
-    """Retorna os CSVs na pasta, na ordem preferencial, depois os restantes."""
-    todos = {p.name: p for p in sorted(pasta.glob("*.csv"))}
+    """Retorna os CSVs na pasta, na ordem preferencial, depois os restantes
+    (uma única passada de os.scandir)."""
+    if not pasta.is_dir():
+        return []
+    with os.scandir(pasta) as it:
+        todos = {e.name: Path(e.path) for e in it
+                 if e.name.endswith(".csv") and e.is_file()}
     ordenados = [todos.pop(nome) for nome in ORDEM if nome in todos]
     ordenados += sorted(todos.values(), key=lambda p: p.name)
     return ordenados
@@ -20,6 +20,8 @@ Uso:
     python pipeline_principal.py --sem-selecao      # pula seleção de apps (usa todos)
     python pipeline_principal.py --reselecionar     # força nova seleção de apps
     python pipeline_principal.py --descritores-padrao  # usa descritores padrão (não interativo)
+    python pipeline_principal.py --sem-cache        # ignora o cache da Play Store na coleta
+    python pipeline_principal.py --csv-brutos       # grava também os brutos em CSV
     python pipeline_principal.py --fase 1           # apenas coleta (com seleção de descritores)
     python pipeline_principal.py --fase 2.5         # apenas lista Word de revisão
     python pipeline_principal.py --fase 3           # apenas limpeza
@@ -29,6 +31,8 @@ Uso:
     python pipeline_principal.py --fase 6           # apenas conversão CSV→Word
 """
 
+from __future__ import annotations
+
 import argparse
 import logging
 import sys
@@ -43,6 +47,9 @@ if str(ROOT) not in sys.path:
 
 from src.config import LOG_DIR
 
+# Fases conhecidas pelo pipeline, na ordem de execução
+FASES = ("1", "2.5", "3", "3.5", "4a", "4b", "5", "6")
+
 
 def _configurar_log():
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -63,8 +70,8 @@ def main():
         description="Pipeline — Sistemas de Informação em Saúde via mHealth")
     parser.add_argument(
         "--fase", nargs="*", default=None,
-        help="Fases a executar: 1 (coleta) 3 (limpeza) 3.5 (seleção) 4a 4b 5 6. "
-             "Se omitido, executa todas.")
+        help="Fases a executar: 1 (coleta) 2.5 (lista Word) 3 (limpeza) "
+             "3.5 (seleção) 4a 4b 5 6. Se omitido, executa todas.")
     parser.add_argument(
         "--sem-selecao", action="store_true",
         help="Pula a seleção interativa e usa todos os apps limpos.")
@@ -74,8 +81,14 @@ def main():
     parser.add_argument(
         "--descritores-padrao", action="store_true",
         help="Usa os descritores padrão sem edição interativa.")
+    parser.add_argument(
+        "--sem-cache", action="store_true",
+        help="Refaz todas as consultas à Play Store, ignorando o cache em disco.")
+    parser.add_argument(
+        "--csv-brutos", action="store_true",
+        help="Além do Parquet, grava os dados brutos em CSV (formato antigo).")
     args = parser.parse_args()
-    fases = set(f.lower() for f in args.fase) if args.fase else {"1","2.5","3","3.5","4a","4b","5","6"}
+    fases = set(f.lower() for f in args.fase) if args.fase else set(FASES)
 
     # determinar modo de seleção de apps
     if args.sem_selecao:
@@ -104,7 +117,9 @@ def main():
     if "1" in fases:
         logger.info("▶ FASE 1-2: Seleção de descritores + Coleta de dados")
         from src.coleta import executar_coleta
-        df_apps, df_reviews = executar_coleta(modo_descritores=modo_descritores)
+        df_apps, df_reviews = executar_coleta(modo_descritores=modo_descritores,
+                                              usar_cache=not args.sem_cache,
+                                              csv_brutos=args.csv_brutos)
         logger.info(f"  → {len(df_apps)} apps, {len(df_reviews)} reviews coletados")
 
     # ── Fase 2.5: Lista Word para revisão ────────────────────────────────
@@ -150,14 +165,10 @@ def main():
     # ── Fase 6: Conversão CSV → Word ─────────────────────────────────────
     if "6" in fases:
         logger.info("▶ FASE 6: Conversão automática de CSVs para Word")
-        import importlib.util, sys as _sys
-        spec = importlib.util.spec_from_file_location(
-            "csv_para_word", ROOT / "csv_para_word.py")
-        mod = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(mod)
-        csvs = mod._coletar_csvs(mod.TABELAS_DIR)
+        from csv_para_word import TABELAS_DIR, _coletar_csvs, gerar_documento_unico
+        csvs = _coletar_csvs(TABELAS_DIR)
         if csvs:
-            saida = mod.gerar_documento_unico(csvs)
+            saida = gerar_documento_unico(csvs)
             logger.info(f"  → Tabelas Word: {saida}")
         else:
             logger.warning("  → Nenhum CSV encontrado em resultados/tabelas/")
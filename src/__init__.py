@@ -13,6 +13,9 @@ Módulos:
     selecao      — Fase 3.5:  Seleção interativa de apps via terminal
     quantitativa — Fase 4A:   Estatística descritiva e correlação de Pearson
     qualitativa  — Fase 4B:   PLN, sentimento e categorização temática
+    graficos     — Gravação dos gráficos das fases 4A e 4B
+    documento    — Utilitários de montagem dos documentos Word
+    leitura_csv  — Leitura dos CSVs do pipeline pelo leitor do Arrow
     relatorio    — Fase 5:    Relatórios Word (.docx) interpretativos
 """
 
@@ -7,19 +7,41 @@ Fase 1:  O usuário pode revisar, adicionar ou remover palavras-chave de busca
 Fase 2:  Extração automatizada de metadados e avaliações de cada app encontrado.
 """
 
+import functools
+import hashlib
+import http.client
+import pickle
+import random
+import re
 import shutil
+import sqlite3
+import sys
+import threading
 import time
 import json
 import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
+from types import MappingProxyType
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from tqdm import tqdm
 from google_play_scraper import search, app as gps_app, reviews, Sort
+from google_play_scraper.exceptions import ExtraHTTPError, NotFoundError
+
+try:                                    # serializador JSON em C (opcional)
+    import orjson
+except ImportError:
+    orjson = None
 
 from src.config import (
     DESCRITORES, DESCRITORES_PADRAO, MAX_RESULTADOS, MAX_REVIEWS,
-    IDIOMA, PAIS, SLEEP_BUSCA, SLEEP_APP,
+    IDIOMA, PAIS, SLEEP_BUSCA, SLEEP_APP, MAX_WORKERS_COLETA,
+    RITMO_FATOR_MIN, RITMO_FATOR_MAX, RITMO_SUCESSOS,
+    RETRY_TENTATIVAS, RETRY_BASE, RETRY_TETO, RETRY_JITTER,
+    CACHE_HTTP, CACHE_VALIDADE, CACHE_MAX_ENTRADAS,
     RAW_DIR, REVIEWS_DIR, LOG_DIR,
 )
 
@@ -85,50 +107,11 @@ def selecionar_descritores(modo: str = "interativo") -> list[str]:
         if not entrada or entrada.lower() in ("ok", "confirmar"):
             break
 
-        # ── adicionar ─────────────────────────────────────────────────
-        if entrada.startswith("+"):
-            novo = entrada[1:].strip()
-            if novo and novo not in descritores:
-                descritores.append(novo)
-                print(f"  ✔ Adicionado: '{novo}'")
-            elif novo in descritores:
-                print(f"  ⚠ '{novo}' já existe na lista.")
-            else:
-                print("  ⚠ Nenhum termo informado.")
-            _exibir_descritores(descritores)
-            continue
-
-        # ── remover ───────────────────────────────────────────────────
-        if entrada.startswith("-"):
-            nums = entrada[1:].strip().replace(",", " ").split()
-            removidos = []
-            for n in nums:
-                try:
-                    idx = int(n) - 1
-                    if 0 <= idx < len(descritores):
-                        removidos.append(descritores[idx])
-                except ValueError:
-                    pass
-            for r in removidos:
-                descritores.remove(r)
-                print(f"  ✔ Removido: '{r}'")
-            if not removidos:
-                print("  ⚠ Nenhum número válido.")
-            _exibir_descritores(descritores)
-            continue
-
-        # ── substituir tudo ───────────────────────────────────────────
-        if entrada.startswith("="):
-            novos = [d.strip() for d in entrada[1:].split(";") if d.strip()]
-            if novos:
-                descritores = novos
-                print(f"  ✔ Lista substituída ({len(descritores)} descritores).")
-                _exibir_descritores(descritores)
-            else:
-                print("  ⚠ Lista vazia. Use ponto-e-vírgula como separador.")
+        comando = _COMANDOS.get(entrada[:1])
+        if comando is None:
+            print("  ⚠ Comando não reconhecido. Use +, -, =, ou Enter.")
             continue
-
-        print("  ⚠ Comando não reconhecido. Use +, -, =, ou Enter.")
+        descritores = comando(descritores, entrada[1:])
 
     # atualizar a variável global para que o pipeline use os descritores escolhidos
     DESCRITORES.clear()
@@ -139,86 +122,374 @@ def selecionar_descritores(modo: str = "interativo") -> list[str]:
     return descritores
 
 
+# ── comandos da seleção de descritores ───────────────────────────────────────
+
+_SEP_LISTA = re.compile(r"\s*;\s*")
+
+
+def _cmd_adicionar(descritores: list[str], arg: str) -> list[str]:
+    novo = arg.strip()
+    if novo and novo not in descritores:
+        descritores.append(novo)
+        print(f"  ✔ Adicionado: '{novo}'")
+    elif novo in descritores:
+        print(f"  ⚠ '{novo}' já existe na lista.")
+    else:
+        print("  ⚠ Nenhum termo informado.")
+    _exibir_descritores(descritores)
+    return descritores
+
+
+def _cmd_remover(descritores: list[str], arg: str) -> list[str]:
+    removidos = []
+    for n in arg.replace(",", " ").split():
+        try:
+            idx = int(n) - 1
+            if 0 <= idx < len(descritores):
+                removidos.append(descritores[idx])
+        except ValueError:
+            pass
+    for r in removidos:
+        descritores.remove(r)
+        print(f"  ✔ Removido: '{r}'")
+    if not removidos:
+        print("  ⚠ Nenhum número válido.")
+    _exibir_descritores(descritores)
+    return descritores
+
+
+def _cmd_substituir(descritores: list[str], arg: str) -> list[str]:
+    novos = [d for d in _SEP_LISTA.split(arg.strip()) if d]
+    if not novos:
+        print("  ⚠ Lista vazia. Use ponto-e-vírgula como separador.")
+        return descritores
+    print(f"  ✔ Lista substituída ({len(novos)} descritores).")
+    _exibir_descritores(novos)
+    return novos
+
+
+_COMANDOS = {"+": _cmd_adicionar, "-": _cmd_remover, "=": _cmd_substituir}
+
+
+def _sem_repeticoes(descritores: list[str]) -> list[str]:
+    """Remove descritores repetidos (ignorando caixa e espaços extras)."""
+    vistos: dict[str, str] = {}
+    for d in descritores:
+        vistos.setdefault(" ".join(d.casefold().split()), d)
+    return list(vistos.values())
+
+
 def _exibir_descritores(descritores: list[str]) -> None:
     """Imprime a lista numerada de descritores."""
-    print()
-    for i, d in enumerate(descritores, 1):
-        print(f"  {i:>3}. {d}")
-    print(f"\n  Total: {len(descritores)} descritor(es)")
+    linhas = "".join(f"  {i:>3}. {d}\n" for i, d in enumerate(descritores, 1))
+    sys.stdout.write(f"\n{linhas}\n  Total: {len(descritores)} descritor(es)\n")
+    sys.stdout.flush()
 
 
 # ── helpers ───────────────────────────────────────────────────────────────────
 
-def _extrair_app(app_id: str) -> dict | None:
+_ESQUEMA_APP = pa.schema([
+    ("appId", pa.string()),
+    ("title", pa.string()),
+    ("summary", pa.string()),
+    ("description", pa.string()),
+    ("installs", pa.string()),
+    ("realInstalls", pa.int64()),
+    ("minInstalls", pa.int64()),
+    ("score", pa.float64()),
+    ("ratings", pa.int64()),
+    ("reviews_count", pa.int64()),
+    ("histogram", pa.string()),
+    ("price", pa.float64()),
+    ("free", pa.bool_()),
+    ("developer", pa.string()),
+    ("developerId", pa.string()),
+    ("developerEmail", pa.string()),
+    ("developerWebsite", pa.string()),
+    ("genre", pa.string()),
+    ("genreId", pa.string()),
+    ("contentRating", pa.string()),
+    ("adSupported", pa.bool_()),
+    ("released", pa.string()),
+    ("updated", pa.int64()),
+    ("lastUpdatedOn", pa.string()),
+    ("version", pa.string()),
+    ("androidVersion", pa.string()),
+    ("androidVersionText", pa.string()),
+    ("size", pa.string()),
+    ("url", pa.string()),
+    ("privacyPolicy", pa.string()),
+    ("icon", pa.string()),
+    ("data_extracao", pa.string()),
+])
+_COLUNAS_APP = tuple(_ESQUEMA_APP.names)
+_APP_PADROES = {"realInstalls": 0, "minInstalls": 0}   # valor se o campo faltar
+_ESQUEMA_REVIEW = pa.schema([
+    ("appId", pa.string()),
+    ("userName_hash", pa.int64()),         # BLAKE2b de 64 bits (_hash_usuario)
+    ("content", pa.string()),
+    ("score", pa.int8()),
+    ("thumbsUpCount", pa.int32()),
+    ("reviewCreatedVersion", pa.string()),
+    ("at", pa.string()),
+    ("replyContent", pa.string()),
+    ("repliedAt", pa.string()),
+    ("data_extracao", pa.string()),
+])
+_LOTE_PARQUET = 20_000   # reviews por row group gravado
+
+
+def _hash_usuario(nome: str | None) -> int:
+    """Identificador estável (BLAKE2b de 64 bits) do autor de um review."""
+    dig = hashlib.blake2b((nome or "").encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(dig, "little", signed=True)
+
+
+_trava_ritmo = threading.Lock()
+_proxima_requisicao = 0.0
+_fator_ritmo = 1.0
+_sucessos_seguidos = 0
+
+
+def _respeitar_intervalo(intervalo: float) -> None:
+    """
+    Espaça o início das requisições em `intervalo` segundos, somando todas as
+    threads — o paralelismo esconde a latência da rede sem aumentar a taxa de
+    requisições à Play Store. O intervalo é escalado por `_fator_ritmo`.
+    """
+    global _proxima_requisicao
+    with _trava_ritmo:
+        agora = time.monotonic()
+        espera = _proxima_requisicao - agora
+        _proxima_requisicao = max(agora, _proxima_requisicao) + intervalo * _fator_ritmo
+    if espera > 0:
+        time.sleep(espera)
+
+
+def _ajustar_ritmo(sucesso: bool) -> None:
+    """Dobra o intervalo após falha transitória; reduz 10% após RITMO_SUCESSOS acertos."""
+    global _fator_ritmo, _sucessos_seguidos
+    with _trava_ritmo:
+        if not sucesso:
+            _fator_ritmo = min(RITMO_FATOR_MAX, _fator_ritmo * 2)
+            _sucessos_seguidos = 0
+            return
+        _sucessos_seguidos += 1
+        if _sucessos_seguidos >= RITMO_SUCESSOS:
+            _fator_ritmo = max(RITMO_FATOR_MIN, _fator_ritmo * 0.9)
+            _sucessos_seguidos = 0
+
+
+_HTTP_RECUPERAVEIS = {429, 500, 502, 503, 504, 529}
+
+
+def _recuperavel(exc: Exception) -> bool:
+    """Indica se a falha é transitória (vale tentar de novo)."""
+    if isinstance(exc, NotFoundError):
+        return False
+    if isinstance(exc, ExtraHTTPError):
+        m = re.search(r"Status code (\d+)", str(exc))
+        return bool(m) and int(m.group(1)) in _HTTP_RECUPERAVEIS
+    if "PlayGatewayError" in str(exc):          # limite de taxa do gateway
+        return True
+    return isinstance(exc, (OSError, http.client.HTTPException))
+
+
+def _com_retentativas(func):
+    """Repete `func` em falhas transitórias, com backoff exponencial e jitter."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        for tentativa in range(RETRY_TENTATIVAS):
+            try:
+                res = func(*args, **kwargs)
+            except Exception as exc:
+                recuperavel = _recuperavel(exc)
+                if recuperavel:
+                    _ajustar_ritmo(sucesso=False)
+                if tentativa == RETRY_TENTATIVAS - 1 or not recuperavel:
+                    raise
+                espera = (min(RETRY_TETO, RETRY_BASE * 2 ** tentativa)
+                          * (1 + random.uniform(0, RETRY_JITTER)))
+                logger.info(f"  {func.__name__}{args}: {exc} — "
+                            f"tentativa {tentativa + 2}/{RETRY_TENTATIVAS} em {espera:.1f}s")
+                time.sleep(espera)
+            else:
+                _ajustar_ritmo(sucesso=True)
+                return res
+    return wrapper
+
+
+_trava_cache = threading.Lock()
+_conexao_cache: sqlite3.Connection | None = None
+_ler_cache = True
+
+
+def _abrir_cache() -> sqlite3.Connection:
+    global _conexao_cache
+    if _conexao_cache is None:
+        con = sqlite3.connect(CACHE_HTTP, isolation_level=None,
+                              check_same_thread=False)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute(
+            "CREATE TABLE IF NOT EXISTS http_cache ("
+            " chave TEXT PRIMARY KEY, payload BLOB NOT NULL,"
+            " obtido_em INTEGER NOT NULL, acessado_em INTEGER NOT NULL)"
+        )
+        _conexao_cache = con
+    return _conexao_cache
+
+
+def _em_cache(func):
+    """
+    Guarda o retorno de `func` no SQLite, válido por CACHE_VALIDADE. O wrapper
+    devolve (resultado, obtido_em): o instante (epoch) em que a resposta veio
+    da Play Store, ou None se acabou de ser consultada nesta chamada.
+    """
+    @functools.wraps(func)
+    def wrapper(*args):
+        chave = repr((func.__name__, args, IDIOMA, PAIS, MAX_RESULTADOS, MAX_REVIEWS))
+        agora = int(time.time())
+        if _ler_cache:
+            with _trava_cache:
+                con = _abrir_cache()
+                lin = con.execute(
+                    "SELECT payload, obtido_em FROM http_cache"
+                    " WHERE chave = ? AND obtido_em > ?",
+                    (chave, agora - CACHE_VALIDADE.total_seconds()),
+                ).fetchone()
+                if lin:
+                    con.execute("UPDATE http_cache SET acessado_em = ? WHERE chave = ?",
+                                (agora, chave))
+                    return pickle.loads(lin[0]), lin[1]
+        res = func(*args)
+        with _trava_cache:
+            _abrir_cache().execute(
+                "INSERT OR REPLACE INTO http_cache VALUES (?, ?, ?, ?)",
+                (chave, pickle.dumps(res), agora, agora),
+            )
+        return res, None
+    return wrapper
+
+
+def _carimbo(obtido_em: int | None, data_extracao: str) -> str:
+    """data_extracao de um registro: a da sessão se a resposta é nova, senão
+    o instante em que a resposta guardada em cache foi obtida."""
+    if obtido_em is None:
+        return data_extracao
+    return datetime.fromtimestamp(obtido_em).isoformat()
+
+
+def _podar_cache() -> None:
+    """Remove entradas vencidas e as menos acessadas além de CACHE_MAX_ENTRADAS."""
+    with _trava_cache:
+        con = _abrir_cache()
+        con.execute("DELETE FROM http_cache WHERE obtido_em <= ?",
+                    (time.time() - CACHE_VALIDADE.total_seconds(),))
+        con.execute(
+            "DELETE FROM http_cache WHERE chave IN (SELECT chave FROM http_cache"
+            " ORDER BY acessado_em DESC LIMIT -1 OFFSET ?)",
+            (CACHE_MAX_ENTRADAS,),
+        )
+
+
+@_em_cache
+@_com_retentativas
+def _baixar_app(app_id: str) -> dict:
+    _respeitar_intervalo(SLEEP_APP)
+    return gps_app(app_id, lang=IDIOMA, country=PAIS)
+
+
+@functools.lru_cache(maxsize=8192)
+def _app_em_memoria(app_id: str) -> tuple[MappingProxyType, int | None]:
+    """Camada em memória sobre o cache em disco (visão somente leitura)."""
+    d, obtido_em = _baixar_app(app_id)
+    return MappingProxyType(d), obtido_em
+
+
+@_em_cache
+@_com_retentativas
+def _baixar_reviews(app_id: str) -> list[dict]:
+    _respeitar_intervalo(SLEEP_APP)
+    revs, _ = reviews(
+        app_id, lang=IDIOMA, country=PAIS,
+        sort=Sort.NEWEST, count=MAX_REVIEWS,
+    )
+    return revs
+
+
+def _extrair_app(app_id: str, data_extracao: str) -> dict | None:
     try:
-        d = gps_app(app_id, lang=IDIOMA, country=PAIS)
-        return {
-            "appId": d.get("appId"),
-            "title": d.get("title"),
-            "summary": d.get("summary"),
-            "description": d.get("description"),
-            "installs": d.get("installs"),
-            "realInstalls": d.get("realInstalls", 0),
-            "minInstalls": d.get("minInstalls", 0),
-            "score": d.get("score"),
-            "ratings": d.get("ratings"),
-            "reviews_count": d.get("reviews"),
-            "histogram": str(d.get("histogram")),
-            "price": d.get("price"),
-            "free": d.get("free"),
-            "developer": d.get("developer"),
-            "developerId": d.get("developerId"),
-            "developerEmail": d.get("developerEmail"),
-            "developerWebsite": d.get("developerWebsite"),
-            "genre": d.get("genre"),
-            "genreId": d.get("genreId"),
-            "contentRating": d.get("contentRating"),
-            "adSupported": d.get("adSupported"),
-            "released": d.get("released"),
-            "updated": d.get("updated"),
-            "lastUpdatedOn": d.get("lastUpdatedOn"),
-            "version": d.get("version"),
-            "androidVersion": d.get("androidVersion"),
-            "androidVersionText": d.get("androidVersionText"),
-            "size": d.get("size"),
-            "url": d.get("url"),
-            "privacyPolicy": d.get("privacyPolicy"),
-            "icon": d.get("icon"),
-            "data_extracao": datetime.now().isoformat(),
-        }
-    except Exception:
+        d, obtido_em = _app_em_memoria(app_id)
+    except Exception as e:
+        logger.warning(f"  App '{app_id}' ignorado: {e}")
         return None
+    out = {k: d.get(k, _APP_PADROES.get(k)) for k in _COLUNAS_APP}
+    out["reviews_count"] = d.get("reviews")
+    out["histogram"] = str(d.get("histogram"))
+    out["data_extracao"] = _carimbo(obtido_em, data_extracao)
+    return out
 
 
-def _extrair_reviews(app_id: str) -> list[dict]:
+def _extrair_reviews(app_id: str, data_extracao: str) -> pa.Table:
+    """Reviews de um app como tabela Arrow no esquema _ESQUEMA_REVIEW."""
     try:
-        revs, _ = reviews(
-            app_id, lang=IDIOMA, country=PAIS,
-            sort=Sort.NEWEST, count=MAX_REVIEWS,
-        )
-        return [
-            {
-                "appId": app_id,
-                "userName_hash": hash(r.get("userName", "")),
-                "content": r.get("content"),
-                "score": r.get("score"),
-                "thumbsUpCount": r.get("thumbsUpCount"),
-                "reviewCreatedVersion": r.get("reviewCreatedVersion"),
-                "at": r.get("at").isoformat() if r.get("at") else None,
-                "replyContent": r.get("replyContent"),
-                "repliedAt": (r.get("repliedAt").isoformat()
-                              if r.get("repliedAt") else None),
-                "data_extracao": datetime.now().isoformat(),
-            }
-            for r in revs
-        ]
-    except Exception:
-        return []
+        revs, obtido_em = _baixar_reviews(app_id)
+    except Exception as e:
+        logger.warning(f"  Reviews de '{app_id}' não obtidos: {e}")
+        revs, obtido_em = [], None
+    data_extracao = _carimbo(obtido_em, data_extracao)
+    try:
+        return pa.Table.from_pydict({
+            "appId": [app_id] * len(revs),
+            "userName_hash": [_hash_usuario(r.get("userName")) for r in revs],
+            "content": [r.get("content") for r in revs],
+            "score": [r.get("score") for r in revs],
+            "thumbsUpCount": [r.get("thumbsUpCount") for r in revs],
+            "reviewCreatedVersion": [r.get("reviewCreatedVersion") for r in revs],
+            "at": [r["at"].isoformat() if r.get("at") else None for r in revs],
+            "replyContent": [r.get("replyContent") for r in revs],
+            "repliedAt": [r["repliedAt"].isoformat() if r.get("repliedAt") else None
+                          for r in revs],
+            "data_extracao": [data_extracao] * len(revs),
+        }, schema=_ESQUEMA_REVIEW)
+    except pa.ArrowException as e:
+        # um valor fora do esquema (nota que não cabe em int8, versão não
+        # textual...) descarta só os reviews deste app, como uma falha de rede
+        logger.warning(f"  Reviews de '{app_id}' fora do esquema: {e}")
+        return _ESQUEMA_REVIEW.empty_table()
+
+
+@_em_cache
+@_com_retentativas
+def _buscar(desc: str) -> set[str]:
+    _respeitar_intervalo(SLEEP_BUSCA)
+    res = search(desc, lang=IDIOMA, country=PAIS, n_hits=MAX_RESULTADOS)
+    return {r["appId"] for r in res}
+
+
+def _coletar_app(app_id: str, data_extracao: str) -> tuple[dict | None, pa.Table | None]:
+    """Metadados + reviews de um app (executado nas threads da Fase 2)."""
+    m = _extrair_app(app_id, data_extracao)
+    if not m:
+        return None, None
+    return m, _extrair_reviews(app_id, data_extracao)
+
+
+def _opcoes_barra(total: int, esperado: int | None = None) -> dict:
+    """
+    Barra de progresso que redesenha no máximo ~2×/s e a cada 0,5% do total.
+    Para barras cujo total cresce durante a execução, `esperado` (estimativa
+    do total final) define esse passo.
+    """
+    passo = max(1, (esperado if esperado is not None else total) // 200)
+    return {"total": total, "mininterval": 0.5, "miniters": passo}
 
 
 # ── pipeline ──────────────────────────────────────────────────────────────────
 
-def executar_coleta(modo_descritores: str = "interativo") -> tuple[pd.DataFrame, pd.DataFrame]:
+def executar_coleta(modo_descritores: str = "interativo",
+                    usar_cache: bool = True,
+                    csv_brutos: bool = False) -> tuple[pd.DataFrame, pd.DataFrame]:
     """
     Executa Fases 1+2 e retorna (df_apps, df_reviews).
 
@@ -227,9 +498,19 @@ def executar_coleta(modo_descritores: str = "interativo") -> tuple[pd.DataFrame,
     modo_descritores : str
         'interativo' → permite ao usuário editar descritores via terminal
         'padrao'     → usa descritores padrão sem perguntar
+    usar_cache : bool
+        False → ignora o cache em disco e consulta a Play Store de novo
+        (as respostas novas ainda atualizam o cache)
+    csv_brutos : bool
+        True → grava também os brutos (apps e reviews) em CSV (formato antigo)
     """
+    global _ler_cache
+    _ler_cache = usar_cache
+    if not usar_cache:
+        _app_em_memoria.cache_clear()
+
     # ── Fase 1: Seleção de descritores ────────────────────────────────────
-    descritores = selecionar_descritores(modo=modo_descritores)
+    descritores = _sem_repeticoes(selecionar_descritores(modo=modo_descritores))
 
     inicio = datetime.now()
     logger.info("=" * 60)
@@ -247,44 +528,88 @@ def executar_coleta(modo_descritores: str = "interativo") -> tuple[pd.DataFrame,
         "idioma": IDIOMA,
         "pais": PAIS,
     }
-    with open(RAW_DIR / "metadados_sessao.json", "w", encoding="utf-8") as f:
-        json.dump(meta, f, ensure_ascii=False, indent=2)
-
-    # Fase 1 — busca
-    logger.info("── FASE 1: Busca de appIds ──")
+    destino_meta = RAW_DIR / "metadados_sessao.json"
+    if orjson is not None:
+        destino_meta.write_bytes(orjson.dumps(meta, option=orjson.OPT_INDENT_2))
+    else:
+        with open(destino_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    # Fases 1 e 2 sobrepostas: cada descritor que retorna já enfileira os
+    # appIds inéditos para extração, sem esperar o fim de todas as buscas.
+    # Só a thread principal acumula colunas e grava o Parquet.
+    logger.info("── FASES 1+2: Busca de appIds e extração de metadados/reviews ──")
+    fase2 = datetime.now()
+    ts = fase2.strftime("%Y%m%d_%H%M%S")
+    data_extracao = fase2.isoformat()   # um único carimbo para toda a sessão
+    destino_rev = REVIEWS_DIR / f"reviews_brutos_{ts}.parquet"
     ids: set[str] = set()
-    for desc in tqdm(descritores, desc="Descritores"):
-        try:
-            res = search(desc, lang=IDIOMA, country=PAIS, n_hits=MAX_RESULTADOS)
-            novos = {r["appId"] for r in res}
-            ids.update(novos)
-            logger.info(f"  '{desc}' → {len(novos)} (total único: {len(ids)})")
-        except Exception as e:
-            logger.warning(f"  Erro em '{desc}': {e}")
-        time.sleep(SLEEP_BUSCA)
+    # apps acumulados por coluna (um único DataFrame no fim); os reviews chegam
+    # como tabelas Arrow e vão para o Parquet em lotes, sem ficar todos na memória
+    apps_cols = {c: [] for c in _COLUNAS_APP}
+    lote_revs: list[pa.Table] = []
+
+    def _gravar_lote():
+        escritor.write_table(pa.concat_tables(lote_revs))
+        lote_revs.clear()
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS_COLETA) as ex_busca, \
+            ThreadPoolExecutor(max_workers=MAX_WORKERS_COLETA) as ex_app, \
+            pq.ParquetWriter(destino_rev, _ESQUEMA_REVIEW, compression="zstd") as escritor, \
+            tqdm(desc="Descritores", position=0, **_opcoes_barra(len(descritores))) as barra_b, \
+            tqdm(desc="Extraindo apps", position=1,
+                 **_opcoes_barra(0, esperado=len(descritores) * MAX_RESULTADOS)) as barra_a:
+        buscas = {ex_busca.submit(_buscar, desc): desc for desc in descritores}
+        pendentes = set(buscas)
+        while pendentes:
+            prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+            for fut in prontos:
+                if fut in buscas:
+                    barra_b.update()
+                    desc = buscas[fut]
+                    try:
+                        novos = fut.result()[0] - ids
+                    except Exception as e:
+                        logger.warning(f"  Erro em '{desc}': {e}")
+                        continue
+                    logger.info(f"  '{desc}' → {len(novos)} novos")
+                    ids |= novos
+                    pendentes.update(ex_app.submit(_coletar_app, app_id, data_extracao)
+                                     for app_id in novos)
+                    if novos:
+                        barra_a.total += len(novos)
+                        barra_a.refresh()
+                    continue
+                barra_a.update()
+                m, r = fut.result()
+                if m:
+                    for c in _COLUNAS_APP:
+                        apps_cols[c].append(m[c])
+                    lote_revs.append(r)
+                    if sum(t.num_rows for t in lote_revs) >= _LOTE_PARQUET:
+                        _gravar_lote()
+        if lote_revs:
+            _gravar_lote()
 
     logger.info(f"Total de appIds únicos: {len(ids)}")
-
-    # Fase 2 — extração
-    logger.info("── FASE 2: Extração de metadados e reviews ──")
-    apps_reg, revs_reg = [], []
-    for app_id in tqdm(ids, desc="Extraindo apps"):
-        m = _extrair_app(app_id)
-        if m:
-            apps_reg.append(m)
-            r = _extrair_reviews(app_id)
-            revs_reg.extend(r)
-        time.sleep(SLEEP_APP)
-
-    df_apps = pd.DataFrame(apps_reg)
-    df_reviews = pd.DataFrame(revs_reg)
+    _podar_cache()
+    df_apps = pd.DataFrame(apps_cols, columns=_COLUNAS_APP, copy=False)
+    df_reviews = pq.read_table(destino_rev).to_pandas()
 
     # Salvar brutos
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    df_apps.to_csv(RAW_DIR / f"apps_brutos_{ts}.csv",
-                   index=False, encoding="utf-8-sig")
-    df_reviews.to_csv(REVIEWS_DIR / f"reviews_brutos_{ts}.csv",
-                      index=False, encoding="utf-8-sig")
+    apps_csv = csv_brutos
+    try:
+        pq.write_table(pa.Table.from_pydict(apps_cols, schema=_ESQUEMA_APP),
+                       RAW_DIR / f"apps_brutos_{ts}.parquet", compression="zstd")
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        logger.warning(f"  Metadados fora do esquema Parquet ({e}); gravando CSV")
+        apps_csv = True
+    if apps_csv:
+        df_apps.to_csv(RAW_DIR / f"apps_brutos_{ts}.csv",
+                       index=False, encoding="utf-8-sig")
+    if csv_brutos:
+        df_reviews.to_csv(REVIEWS_DIR / f"reviews_brutos_{ts}.csv",
+                          index=False, encoding="utf-8-sig")
 
     logger.info(f"Coleta concluída: {len(df_apps)} apps, "
                 f"{len(df_reviews)} reviews ({datetime.now() - inicio})")
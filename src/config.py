@@ -6,6 +6,7 @@ Título: A Onipresença dos Sistemas de Informação em Saúde: Uma Análise da
 Todos os caminhos, parâmetros e constantes ficam aqui.
 """
 
+import re
 from pathlib import Path
 from datetime import datetime, timedelta
 
@@ -38,10 +39,12 @@ TABELAS_DIR  = RESULTS_DIR / "tabelas"
 RELATORIO_DIR = RESULTS_DIR / "relatorios"
 LOG_DIR      = ROOT_DIR / "logs"
 
-# Criar diretórios se não existirem
-for _d in [RAW_DIR, REVIEWS_DIR, CLEAN_DIR, GRAFICOS_DIR, TABELAS_DIR,
-           RELATORIO_DIR, LOG_DIR]:
-    _d.mkdir(parents=True, exist_ok=True)
+# Criar diretórios se não existirem (só um stat por pasta quando já existem)
+_DIRS_SAIDA = (RAW_DIR, REVIEWS_DIR, CLEAN_DIR, GRAFICOS_DIR, TABELAS_DIR,
+               RELATORIO_DIR, LOG_DIR)
+for _d in _DIRS_SAIDA:
+    if not _d.is_dir():
+        _d.mkdir(parents=True, exist_ok=True)
 
 # ==============================================================================
 # PARÂMETROS DE COLETA (Fases 1+2)
@@ -49,7 +52,7 @@ for _d in [RAW_DIR, REVIEWS_DIR, CLEAN_DIR, GRAFICOS_DIR, TABELAS_DIR,
 
 # Descritores padrão — focados em Sistemas de Informação em Saúde (SIS)
 # O usuário pode adicionar/remover descritores interativamente na Fase 1.
-DESCRITORES_PADRAO = [
+DESCRITORES_PADRAO = (
     # ── SIS / Prontuário Eletrônico ───
     "prontuário eletrônico saúde",
     "sistema informação saúde",
@@ -80,18 +83,39 @@ DESCRITORES_PADRAO = [
     "farmácia hospitalar sistema",
     "laboratório saúde sistema",
     "SINAN vigilância",
-]
+)
 
 # Cópia mutável usada em runtime (pode ser alterada interativamente)
 DESCRITORES = list(DESCRITORES_PADRAO)
 
-CATEGORIAS_ALVO  = ["MEDICAL", "HEALTH_AND_FITNESS"]
+CATEGORIAS_ALVO  = ("MEDICAL", "HEALTH_AND_FITNESS")
 MAX_RESULTADOS   = 30     # apps por descritor
 MAX_REVIEWS      = 200    # comentários por app
 IDIOMA           = "pt_BR"
 PAIS             = "br"
 SLEEP_BUSCA      = 1.0    # segundos entre buscas
 SLEEP_APP        = 0.8    # segundos entre extração de apps
+MAX_WORKERS_COLETA = 8    # requisições simultâneas (o intervalo acima é mantido)
+
+# Ritmo adaptativo: os intervalos acima são multiplicados por um fator que
+# dobra a cada falha transitória (429/5xx) e cai 10% a cada RITMO_SUCESSOS
+# respostas seguidas sem erro, dentro de [FATOR_MIN, FATOR_MAX].
+RITMO_FATOR_MIN  = 0.25
+RITMO_FATOR_MAX  = 8.0
+RITMO_SUCESSOS   = 20
+
+# Novas tentativas em falhas transitórias (HTTP 429/5xx, rede):
+# espera = min(TETO, BASE · 2^tentativa) · (1 + U(0, JITTER))
+RETRY_TENTATIVAS = 5
+RETRY_BASE       = 1.0    # segundos
+RETRY_TETO       = 30.0   # segundos
+RETRY_JITTER     = 0.5
+
+# Cache em disco (SQLite) das respostas da Play Store — reexecuções não
+# repetem buscas/extrações já feitas. Desative com --sem-cache.
+CACHE_HTTP          = RAW_DIR / "http_cache.sqlite"
+CACHE_VALIDADE      = timedelta(days=7)
+CACHE_MAX_ENTRADAS  = 50_000   # acima disso, descarta as menos acessadas
 
 # ==============================================================================
 # PARÂMETROS DE FILTRAGEM (Fase 3)
@@ -103,7 +127,7 @@ DATA_REFERENCIA        = datetime.now()
 DATA_CORTE_ATUALIZACAO = DATA_REFERENCIA - timedelta(days=MESES_OBSOLESCENCIA * 30)
 
 # Palavras-chave de inclusão temática — foco em SIS e integração mHealth
-KEYWORDS_INCLUSAO = [
+KEYWORDS_INCLUSAO = (
     # ── Prontuário / EHR ───
     "prontuário", "prontuario", "ehr", "electronic health",
     "medical record", "registro eletrônico", "registro eletronico",
@@ -141,10 +165,10 @@ KEYWORDS_INCLUSAO = [
     "prescrição", "prescricao", "receita médica",
     "hemograma", "exame", "laudo",
     "enfermagem",
-]
+)
 
 # Palavras-chave de exclusão (fitness recreativo / sem relação com SIS)
-KEYWORDS_EXCLUSAO_TITULO = [
+KEYWORDS_EXCLUSAO_TITULO = (
     "academia", "gym", "workout", "fitness tracker",
     "dieta", "emagrecer", "perder peso", "caloria",
     "yoga", "meditação", "meditacao", "mindfulness",
@@ -153,16 +177,16 @@ KEYWORDS_EXCLUSAO_TITULO = [
     "receita culinária", "receita culinaria",
     "personal trainer", "bodybuilding",
     "sleep tracker", "ciclo menstrual",
-]
+)
 
 # Classificação de desenvolvedores (3 categorias)
-KEYWORDS_GOV = [
+KEYWORDS_GOV = (
     "ministério", "ministerio", "secretaria", "governo",
     "prefeitura", "municipal", "estadual", "federal",
     "datasus", "sus", "fiocruz", "anvisa", "ans",
     "universidade", "university", "usp", "unicamp", "ufmg",
     "instituto", "fundação", "fundacao",
-]
+)
 
 # ==============================================================================
 # EIXOS TEMÁTICOS (Fase 4B) — Dimensões da Integração mHealth/SIS
@@ -170,7 +194,7 @@ KEYWORDS_GOV = [
 
 EIXOS_TEMATICOS = {
     "Interoperabilidade e Integração de Dados": {
-        "keywords": [
+        "keywords": (
             "sincroniz", "sincronia", "integra", "dados não",
             "dados nao", "conectar", "conexão", "conexao",
             "importar", "exportar", "transferir", "transferência",
@@ -183,11 +207,11 @@ EIXOS_TEMATICOS = {
             "interoperab", "fhir", "hl7", "banco de dados",
             "prontuário", "prontuario", "registro",
             "migrar", "migração", "backup",
-        ],
+        ),
         "cor": "#1565C0",
     },
     "Segurança da Informação e Privacidade": {
-        "keywords": [
+        "keywords": (
             "segurança", "seguranca", "privacidade", "dados pessoais",
             "lgpd", "proteção", "protecao", "vazamento", "vazar",
             "senha", "criptograf", "hack", "roubar", "roubaram",
@@ -197,11 +221,11 @@ EIXOS_TEMATICOS = {
             "expor", "exposição", "dados sensíveis", "dados sensiveis",
             "autenticação", "autenticacao", "token", "biometria",
             "certificado digital", "assinatura digital",
-        ],
+        ),
         "cor": "#C62828",
     },
     "Usabilidade e Experiência do Usuário (UX)": {
-        "keywords": [
+        "keywords": (
             "difícil", "dificil", "complicad", "confus",
             "interface", "tela", "botão", "botao", "menu",
             "intuitiv", "layout", "design", "visual",
@@ -212,11 +236,11 @@ EIXOS_TEMATICOS = {
             "complicado de usar", "difícil de usar",
             "ux", "experiência", "experiencia", "usabilidad",
             "tutorial", "ajuda", "manual",
-        ],
+        ),
         "cor": "#F57F17",
     },
     "Funcionalidade e Estabilidade Técnica": {
-        "keywords": [
+        "keywords": (
             "bug", "erro", "crash", "trava", "travando",
             "fecha sozinho", "fechou", "parou", "parar de funcionar",
             "não funciona", "nao funciona", "não abre", "nao abre",
@@ -226,11 +250,11 @@ EIXOS_TEMATICOS = {
             "lixo", "péssimo", "pessimo", "horrível", "horrivel",
             "inútil", "inutil", "porcaria",
             "instável", "instavel", "versão", "versao",
-        ],
+        ),
         "cor": "#6A1B9A",
     },
     "Desempenho e Infraestrutura": {
-        "keywords": [
+        "keywords": (
             "lento", "lentidão", "lentidao", "demora",
             "pesado", "memória", "memoria", "bateria",
             "consumo", "espaço", "espaco", "armazenamento",
@@ -239,20 +263,29 @@ EIXOS_TEMATICOS = {
             "internet", "banda", "wifi", "3g", "4g", "5g",
             "servidor fora", "indisponível", "indisponivel",
             "tempo de resposta", "timeout",
-        ],
+        ),
         "cor": "#2E7D32",
     },
 }
 
+# Uma regex compilada por eixo (chaves mais longas primeiro), para marcar
+# textos sem recompilar padrões a cada chamada
+EIXOS_REGEX = {
+    eixo: re.compile(
+        "|".join(map(re.escape, sorted(info["keywords"], key=len, reverse=True))),
+        re.IGNORECASE)
+    for eixo, info in EIXOS_TEMATICOS.items()
+}
+
 # ==============================================================================
 # PLN
 # ==============================================================================
 
-STOPWORDS_EXTRAS = {
+STOPWORDS_EXTRAS = frozenset({
     "app", "aplicativo", "aplicação", "aplicacao", "muito", "mais",
     "ainda", "aqui", "lá", "la", "pra", "pro", "pelo", "pela",
     "tá", "ta", "tô", "to", "ai", "aí", "né", "ne", "gente",
     "coisa", "coisas", "vez", "vezes", "dia", "dias", "ter",
     "ser", "fazer", "pode", "vai", "vou", "está", "esta",
     "esse", "essa", "isso", "isto", "dele", "dela",
-}
+})
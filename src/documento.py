@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Utilitários de montagem dos documentos Word (.docx).
+"""
+
+import io
+import re
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from docx.oxml import OxmlElement
+
+_QUEBRAS = re.compile(r"([\t\r\n])")
+
+
+def add_paragrafos(doc, textos, style=None) -> None:
+    """Acrescenta vários parágrafos simples (opcionalmente com um estilo, como
+    "List Bullet") ao corpo do documento de uma só vez."""
+    style_id = doc.styles[style].style_id if style else None
+    paragrafos = []
+    for texto in textos:
+        p = OxmlElement("w:p")
+        if style_id:
+            p.get_or_add_pPr().style = style_id
+        r = OxmlElement("w:r")
+        r.text = texto
+        p.append(r)
+        paragrafos.append(p)
+    body = doc.element.body
+    pos = len(body) - (body.sectPr is not None)     # antes do <w:sectPr> final
+    body[pos:pos] = paragrafos
+
+
+def salvar_docx(doc, destino: Path) -> None:
+    """Serializa o documento em memória e grava numa única escrita, num
+    arquivo temporário renomeado no fim (sem .docx pela metade no destino)."""
+    buf = io.BytesIO()
+    doc.save(buf)
+    tmp = destino.with_name(destino.name + ".tmp")
+    tmp.write_bytes(buf.getbuffer())
+    tmp.replace(destino)
+
+
+def conteudo_run(texto: str) -> str:
+    """Conteúdo de um w:r equivalente a `run.text = texto` do python-docx."""
+    partes = []
+    for parte in _QUEBRAS.split(texto):
+        if parte == "\t":
+            partes.append("<w:tab/>")
+        elif parte in ("\r", "\n"):
+            partes.append("<w:br/>")
+        elif parte:
+            esp = ' xml:space="preserve"' if parte != parte.strip() else ""
+            partes.append(f"<w:t{esp}>{escape(parte)}</w:t>")
+    return "".join(partes)
+
+
+def celula_xml(texto: str, largura, rpr: str = "", tcpr: str = "",
+               ppr: str = "") -> str:
+    """w:tc de largura fixa com um parágrafo de um só run; `tcpr`, `ppr` e
+    `rpr` são o XML extra das propriedades da célula, do parágrafo e do run."""
+    return (f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{largura}"/>{tcpr}</w:tcPr>'
+            f'<w:p>{ppr}<w:r><w:rPr>{rpr}</w:rPr>{conteudo_run(texto)}</w:r></w:p></w:tc>')
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+"""
+Gravação dos gráficos das fases 4A e 4B.
+"""
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from src.config import GRAFICOS_DIR
+
+
+def salvar_fig(fig, nome: str, fechar: bool = True) -> None:
+    """Grava o PNG em GRAFICOS_DIR, recomprimido sem perdas (zlib máximo,
+    filtros otimizados), e fecha a figura. É esse arquivo que entra no .docx."""
+    fig.savefig(GRAFICOS_DIR / nome, pil_kwargs={"optimize": True})
+    if fechar:
+        plt.close(fig)
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+Leitura dos CSVs do pipeline pelo leitor CSV do Arrow (multithread).
+"""
+
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+# Textos de review e descrições de app trazem quebras de linha entre aspas
+OPCOES_PARSE = pacsv.ParseOptions(newlines_in_values=True)
+
+# Nulos do leitor C do pandas (os padrões do Arrow mais "None" e "<NA>")
+NULOS_PANDAS = (*pacsv.ConvertOptions().null_values, "None", "<NA>")
+
+
+def colunas_csv(caminho: Path) -> list[str]:
+    """Nomes das colunas do cabeçalho, como o pandas os leria."""
+    return list(pd.read_csv(caminho, encoding="utf-8-sig", nrows=0).columns)
+
+
+def ler_csv_arrow(caminho: Path, colunas=None, tipos=None) -> pa.Table:
+    """Lê o CSV inteiro numa tabela Arrow, com os nulos do pandas. Com
+    `colunas`, só as que existirem no arquivo; `tipos` fixa o tipo Arrow de
+    algumas colunas (as demais são inferidas)."""
+    opcoes = pacsv.ConvertOptions(column_types=tipos or {},
+                                  null_values=NULOS_PANDAS, strings_can_be_null=True)
+    if colunas is not None:
+        opcoes.include_columns = [c for c in colunas_csv(caminho) if c in colunas]
+    return pacsv.read_csv(caminho, parse_options=OPCOES_PARSE, convert_options=opcoes)
+
+
+def abrir_csv_arrow(caminho: Path, read_options=None,
+                    convert_options=None) -> pacsv.CSVStreamingReader:
+    """Leitor em blocos (memória constante); o esquema vem do 1º bloco."""
+    return pacsv.open_csv(caminho, read_options=read_options,
+                          parse_options=OPCOES_PARSE,
+                          convert_options=convert_options)
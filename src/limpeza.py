@@ -5,12 +5,18 @@ Critérios alinhados ao estudo: Sistemas de Informação em Saúde / mHealth.
 """
 
 import logging
+import re
 from datetime import datetime
 from pathlib import Path
 
 import pandas as pd
 import numpy as np
 
+try:                                    # busca multipadrão em C (opcional)
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 from src.config import (
     RAW_DIR, REVIEWS_DIR, CLEAN_DIR,
     CATEGORIAS_ALVO, MIN_INSTALACOES, DATA_CORTE_ATUALIZACAO,
@@ -20,24 +26,113 @@ from src.config import (
 logger = logging.getLogger(__name__)
 
 
-def _contem(texto: str, keywords: list[str]) -> bool:
-    if not isinstance(texto, str):
-        return False
-    t = texto.lower()
-    return any(k.lower() in t for k in keywords)
+def _buscador(keywords):
+    """
+    Função `texto -> bool` que diz se alguma keyword ocorre no texto, que deve
+    vir já em minúsculas. Uma passada por texto: autômato Aho-Corasick quando
+    disponível, senão uma alternância regex compilada.
+    """
+    chaves = sorted({k.lower() for k in keywords})
+    if ahocorasick is not None:
+        automato = ahocorasick.Automaton()
+        for k in chaves:
+            automato.add_word(k, k)
+        automato.make_automaton()
+
+        def _tem(texto):
+            if not isinstance(texto, str):
+                return False
+            return next(automato.iter(texto), None) is not None
+    else:
+        padrao = re.compile("|".join(map(re.escape, chaves)))
+
+        def _tem(texto):
+            if not isinstance(texto, str):
+                return False
+            return padrao.search(texto) is not None
+    return _tem
+
+
+_TEM_INCLUSAO = _buscador(KEYWORDS_INCLUSAO)
+_TEM_EXCLUSAO_TITULO = _buscador(KEYWORDS_EXCLUSAO_TITULO)
+
+# Classificação de desenvolvedor: governo tem precedência sobre instituição
+_KEYWORDS_GOVERNO = (
+    "ministério", "ministerio", "secretaria", "governo",
+    "prefeitura", "municipal", "estadual", "federal",
+    "datasus", "sus", "fiocruz", "anvisa", "ans",
+)
+_KEYWORDS_INST = (
+    "universidade", "university", "usp", "unicamp", "ufmg",
+    "instituto", "fundação", "fundacao", "hospital", "associação",
+    "crm", "cfm", "cfn", "coren", "cfp", "unimed", "einstein",
+)
+_RE_GOVERNO = re.compile("|".join(map(re.escape, _KEYWORDS_GOVERNO)))
+_RE_INST = re.compile("|".join(map(re.escape, _KEYWORDS_INST)))
+
+
+# Formatos de lastUpdatedOn ("Mar 5, 2024" da Play Store; ISO de dumps antigos)
+_FORMATOS_DATA = ("%b %d, %Y", "%B %d, %Y", "%Y-%m-%d")
+
+
+def _datas_texto(s: pd.Series) -> pd.Series:
+    """Converte datas textuais tentando cada formato explícito em ordem
+    (caminho rápido, sem inferência por elemento). As que sobrarem, como
+    "2024-03-05 10:00:00" ou meses em outro locale, passam pela inferência
+    do pandas; só o que ela também não entender vira NaT."""
+    datas = pd.Series(pd.NaT, index=s.index, dtype="datetime64[ns]")
+    for fmt in _FORMATOS_DATA:
+        faltam = datas.isna() & s.notna()
+        if not faltam.any():
+            return datas
+        datas = datas.fillna(pd.to_datetime(s[faltam], format=fmt, errors="coerce"))
+    faltam = datas.isna() & s.notna()
+    if faltam.any():
+        datas = datas.fillna(pd.to_datetime(s[faltam], format="mixed",
+                                            errors="coerce"))
+    return datas
+
+
+def _bruto_mais_recente(pasta: Path, prefixo: str) -> Path | None:
+    """Arquivo bruto mais recente (Parquet ou CSV de coletas antigas);
+    no mesmo timestamp, prefere o Parquet."""
+    arqs = [*pasta.glob(f"{prefixo}_*.parquet"), *pasta.glob(f"{prefixo}_*.csv")]
+    return max(arqs, key=lambda p: (p.stem, p.suffix == ".parquet"), default=None)
+
+
+# Colunas de texto livre: strings Arrow (buffer contíguo em vez de um objeto
+# Python por célula), mais rápidas nas operações .str da etapa 5
+_TEXTO_LIVRE = ("title", "summary", "description", "developer")
+
+def _ler_bruto(caminho: Path) -> pd.DataFrame:
+    """Lê um arquivo bruto inteiro: todas as colunas coletadas seguem para os
+    limpos, que são entregáveis do estudo."""
+    if caminho.suffix == ".parquet":
+        df = pd.read_parquet(caminho)
+    else:
+        df = pd.read_csv(caminho, encoding="utf-8-sig")
+    texto = [c for c in _TEXTO_LIVRE if c in df.columns]
+    return df.astype(dict.fromkeys(texto, "string[pyarrow]"))
 
 
 def _carregar_brutos() -> tuple[pd.DataFrame, pd.DataFrame]:
-    csvs_a = sorted(RAW_DIR.glob("apps_brutos_*.csv"), reverse=True)
-    csvs_r = sorted(REVIEWS_DIR.glob("reviews_brutos_*.csv"), reverse=True)
-    if not csvs_a:
+    arq_a = _bruto_mais_recente(RAW_DIR, "apps_brutos")
+    arq_r = _bruto_mais_recente(REVIEWS_DIR, "reviews_brutos")
+    if arq_a is None:
         raise FileNotFoundError(f"Nenhum arquivo de apps em {RAW_DIR}")
-    df_a = pd.read_csv(csvs_a[0], encoding="utf-8-sig")
-    df_r = pd.read_csv(csvs_r[0], encoding="utf-8-sig") if csvs_r else pd.DataFrame()
+    df_a = _ler_bruto(arq_a)
+    df_r = _ler_bruto(arq_r) if arq_r else pd.DataFrame()
     logger.info(f"Brutos carregados: {len(df_a)} apps, {len(df_r)} reviews")
     return df_a, df_r
 
 
+def _salvar_csv(df: pd.DataFrame, caminho: Path) -> None:
+    """CSV UTF-8 com BOM no formato do to_csv do pandas — os limpos são
+    entregáveis do estudo e lidos por ferramentas externas, então aspas,
+    booleanos, datas e floats seguem o formato de sempre."""
+    df.to_csv(caminho, index=False, encoding="utf-8-sig")
+
+
 def executar_limpeza() -> tuple[pd.DataFrame, pd.DataFrame]:
     """Aplica todos os filtros e retorna (df_apps, df_reviews) limpos."""
     logger.info("=" * 60)
@@ -51,7 +146,7 @@ def executar_limpeza() -> tuple[pd.DataFrame, pd.DataFrame]:
 
     # 1. Duplicatas
     antes = len(df)
-    df = df.drop_duplicates(subset=["appId"], keep="first")
+    df = df.drop_duplicates(subset=["appId"], keep="first", ignore_index=True)
     etapas.append(("Remoção de duplicatas", antes, len(df)))
 
     # 2. Categoria
@@ -72,58 +167,45 @@ def executar_limpeza() -> tuple[pd.DataFrame, pd.DataFrame]:
     df["updated_dt"] = pd.to_datetime(df["updated"], unit="s", errors="coerce")
     if "lastUpdatedOn" in df.columns:
         mask = df["updated_dt"].isna()
-        df.loc[mask, "updated_dt"] = pd.to_datetime(
-            df.loc[mask, "lastUpdatedOn"], errors="coerce")
+        df["updated_dt"] = df["updated_dt"].fillna(
+            _datas_texto(df.loc[mask, "lastUpdatedOn"]))
     df = df[df["updated_dt"] >= DATA_CORTE_ATUALIZACAO].copy()
     etapas.append(("Atualização < 24 meses", antes, len(df)))
 
     # 5. Relevância temática
     antes = len(df)
-    df["_texto"] = (df["title"].fillna("") + " " +
-                    df["summary"].fillna("") + " " +
-                    df["description"].fillna(""))
-    mask_inc = df["_texto"].apply(lambda x: _contem(x, KEYWORDS_INCLUSAO))
-    mask_exc = df["title"].apply(lambda x: _contem(x, KEYWORDS_EXCLUSAO_TITULO))
-    df = df[mask_inc & ~mask_exc].copy()
-    df.drop(columns=["_texto"], inplace=True)
+    # exclusão pelo título primeiro: o texto longo (título + resumo + descrição)
+    # só é montado para os apps que sobram
+    titulo = df["title"].fillna("").str.lower()
+    mask_exc = titulo.map(_TEM_EXCLUSAO_TITULO).astype(bool)
+    df, titulo = df[~mask_exc], titulo[~mask_exc]
+    texto = titulo.str.cat([df["summary"].fillna("").str.lower(),
+                            df["description"].fillna("").str.lower()], sep=" ")
+    mask_inc = texto.map(_TEM_INCLUSAO).astype(bool)
+    df = df[mask_inc].copy()
+    del titulo, texto
     etapas.append(("Relevância temática", antes, len(df)))
 
     # 6. Classificação de desenvolvedor (3 categorias)
-    _KEYWORDS_GOVERNO = [
-        "ministério", "ministerio", "secretaria", "governo",
-        "prefeitura", "municipal", "estadual", "federal",
-        "datasus", "sus", "fiocruz", "anvisa", "ans",
-    ]
-    _KEYWORDS_INST = [
-        "universidade", "university", "usp", "unicamp", "ufmg",
-        "instituto", "fundação", "fundacao", "hospital", "associação",
-        "crm", "cfm", "cfn", "coren", "cfp", "unimed", "einstein",
-    ]
-
-    def _classificar_dev(dev):
-        if not isinstance(dev, str):
-            return "Comercial"
-        d = dev.lower()
-        if any(k in d for k in _KEYWORDS_GOVERNO):
-            return "Governamental"
-        if any(k in d for k in _KEYWORDS_INST):
-            return "Institucional"
-        return "Comercial"
-
-    df["tipo_desenvolvedor"] = df["developer"].apply(_classificar_dev)
+    dev = df["developer"].fillna("").astype(str).str.lower()
+    df["tipo_desenvolvedor"] = np.select(
+        [dev.str.contains(_RE_GOVERNO), dev.str.contains(_RE_INST)],
+        ["Governamental", "Institucional"], default="Comercial")
+    df["tipo_desenvolvedor"] = df["tipo_desenvolvedor"].astype("category")
+    df["genreId"] = df["genreId"].astype("category")
 
     # 7. Ordenar
     df = df.sort_values("instalacoes_num", ascending=False).reset_index(drop=True)
 
     # 8. Filtrar reviews
-    ids_validos = set(df["appId"])
+    # junção por hash com os appId já únicos (mantém a ordem dos reviews)
     if len(df_r):
-        df_r = df_r[df_r["appId"].isin(ids_validos)].copy()
+        df_r = df_r.merge(df[["appId"]], on="appId", how="inner", sort=False)
 
     # Salvar
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    df.to_csv(CLEAN_DIR / f"apps_limpos_{ts}.csv", index=False, encoding="utf-8-sig")
-    df_r.to_csv(CLEAN_DIR / f"reviews_limpos_{ts}.csv", index=False, encoding="utf-8-sig")
+    _salvar_csv(df, CLEAN_DIR / f"apps_limpos_{ts}.csv")
+    _salvar_csv(df_r, CLEAN_DIR / f"reviews_limpos_{ts}.csv")
 
     # Relatório textual
     linhas = ["RELATÓRIO DE LIMPEZA", "=" * 40,
@@ -15,18 +15,25 @@ Uso isolado:
 """
 
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 from docx import Document
 from docx.shared import Inches, Pt, RGBColor, Cm
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.table import WD_TABLE_ALIGNMENT
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
+from docx.oxml.ns import nsdecls, qn
+from docx.oxml import OxmlElement, parse_xml
 
 from src.config import RAW_DIR, RELATORIO_DIR
+from src.documento import celula_xml
+from src.leitura_csv import ler_csv_arrow
 
 logger = logging.getLogger(__name__)
 
@@ -44,8 +51,13 @@ COLUNAS = [
     ("Incluir?",        None,            1.2),   # coluna em branco para marcação
 ]
 
-# larguras em cm
+# larguras em cm e em twips (1cm ≈ 567 twips), já como texto para o XML
 _WIDTHS_CM = [c[2] for c in COLUNAS]
+_WIDTHS_TWIPS = [str(int(w * 567)) for w in _WIDTHS_CM]
+
+# valores de formatação reutilizados em todas as células
+_pt = lru_cache(maxsize=None)(Pt)
+_rgb = lru_cache(maxsize=None)(RGBColor.from_string)
 
 
 # ── helpers de formatação ─────────────────────────────────────────────────────
@@ -70,29 +82,119 @@ def _set_cell_text(cell, text: str, bold=False, size=8,
     p.alignment = align
     run = p.add_run(str(text))
     run.bold = bold
-    run.font.size = Pt(size)
+    run.font.size = _pt(size)
     if color:
-        run.font.color.rgb = RGBColor(*bytes.fromhex(color))
-    p.paragraph_format.space_before = Pt(1)
-    p.paragraph_format.space_after  = Pt(1)
+        run.font.color.rgb = _rgb(color)
+    p.paragraph_format.space_before = _pt(1)
+    p.paragraph_format.space_after  = _pt(1)
 
 
-def _set_col_width(cell, width_cm: float):
-    tc = cell._tc
-    tcPr = tc.get_or_add_tcPr()
-    tcW = OxmlElement("w:tcW")
-    tcW.set(qn("w:w"), str(int(width_cm * 567)))   # 1cm ≈ 567 twips
+def _set_col_width(cell, twips: str):
+    tcW = cell._tc.get_or_add_tcPr().get_or_add_tcW()
+    tcW.set(qn("w:w"), twips)
     tcW.set(qn("w:type"), "dxa")
-    tcPr.append(tcW)
+
+
+# ── linhas da tabela em XML ───────────────────────────────────────────────────
+_CAMPOS_LINHA = ("appId", "title", "developer", "genreId", "score", "installs",
+                 "minInstalls", "lastUpdatedOn", "updated", "free")
+_ALINHAMENTOS = ("center", "left", "left", "left", "left",
+                 "center", "left", "left", "center", "left")
+# propriedades das células: fundo, espaçamento/alinhamento e run 8pt sem negrito
+_SHD_XML = '<w:shd w:val="clear" w:color="auto" w:fill="{}"/>'
+_PPR_XML = {jc: f'<w:pPr><w:spacing w:before="20" w:after="20"/><w:jc w:val="{jc}"/></w:pPr>'
+            for jc in set(_ALINHAMENTOS)}
+_RPR_XML = '<w:b w:val="0"/><w:sz w:val="16"/>'
+
+
+def _campo(df: pd.DataFrame, campo: str) -> pd.Series:
+    if campo in df.columns:
+        return df[campo]
+    return pd.Series(None, index=df.index, dtype=object)
+
+
+def _texto(s: pd.Series) -> pd.Series:
+    """str() de cada célula, com "" no lugar de NaN."""
+    s = s.astype(object)
+    return s.where(s.notna(), "").astype(str)
+
+
+def _textos_colunas(df: pd.DataFrame) -> list[list[str]]:
+    """Textos das colunas App ID … Gratuito, formatados coluna a coluna."""
+    score = _campo(df, "score")
+    num = pd.to_numeric(score, errors="coerce")
+    score_str = np.where(
+        num.notna(), np.char.mod("%.1f", num.to_numpy(float, na_value=np.nan)),
+        np.where(score.notna(), _texto(score), "—"))
+
+    livre = _campo(df, "free")
+    free_str = np.where(
+        _texto(livre).str.lower().isin(("true", "1", "sim", "yes")), "Sim",
+        np.where(livre.notna(), "Não", "—"))
+
+    inst = _texto(_campo(df, "installs"))
+    atual = _texto(_campo(df, "lastUpdatedOn"))
+    return [
+        _texto(_campo(df, "appId")).str[:50].tolist(),          # App ID
+        _texto(_campo(df, "title")).str[:55].tolist(),          # Nome
+        _texto(_campo(df, "developer")).str[:50].tolist(),      # Desenvolvedor
+        _texto(_campo(df, "genreId")).tolist(),                 # Categoria
+        score_str.tolist(),                                     # Nota
+        inst.where(inst != "", _texto(_campo(df, "minInstalls"))).tolist(),
+        atual.where(atual != "", _texto(_campo(df, "updated"))).tolist(),
+        free_str.tolist(),                                      # Gratuito
+    ]
+
+
+def _linhas_xml(registros: list[tuple], desloc: int = 0) -> str:
+    """XML (w:tr) dos `registros`, numerados a partir de `desloc + 1`."""
+    linhas = []
+    for n, textos in enumerate(registros, desloc + 1):
+        fill = "EEF2FF" if n % 2 == 0 else "FFFFFF"
+        fills = [fill] * 9 + ["FFF9C4"]   # amarelo claro = campo a preencher
+        celulas = "".join(
+            celula_xml(t, w, _RPR_XML, _SHD_XML.format(f), _PPR_XML[jc])
+            for t, w, f, jc in zip((str(n), *textos, ""), _WIDTHS_TWIPS,
+                                   fills, _ALINHAMENTOS)
+        )
+        linhas.append(f"<w:tr>{celulas}</w:tr>")
+    return "".join(linhas)
+
+
+# Abaixo disso o custo de subir os processos supera o ganho
+_MIN_LINHAS_PARALELO = 2000
+
+
+def _linhas_xml_paralelo(registros: list[tuple]) -> str:
+    """Monta o XML das linhas em fatias, uma por núcleo, e concatena em ordem.
+
+    Usa processos: a formatação de strings não libera o GIL, então threads
+    não ganhariam nada aqui.
+    """
+    total = len(registros)
+    nucleos = os.cpu_count() or 1
+    if total <= _MIN_LINHAS_PARALELO or nucleos < 2:
+        return _linhas_xml(registros)
+    limites = [total * i // nucleos for i in range(nucleos + 1)]
+    fatias = [registros[lo:hi] for lo, hi in zip(limites, limites[1:])]
+    with ProcessPoolExecutor(max_workers=nucleos) as ex:
+        return "".join(ex.map(_linhas_xml, fatias, limites[:-1]))
 
 
 # ── leitura dos dados brutos ──────────────────────────────────────────────────
 def _carregar_brutos() -> pd.DataFrame:
-    csvs = sorted(RAW_DIR.glob("apps_brutos_*.csv"), reverse=True)
-    if not csvs:
-        raise FileNotFoundError(f"Nenhum arquivo apps_brutos_*.csv em {RAW_DIR}")
-    df = pd.read_csv(csvs[0], encoding="utf-8-sig")
-    logger.info(f"Apps brutos carregados: {len(df)} (de {csvs[0].name})")
+    # Parquet (coletas novas) ou CSV; no mesmo timestamp, prefere o Parquet
+    arqs = [*RAW_DIR.glob("apps_brutos_*.parquet"), *RAW_DIR.glob("apps_brutos_*.csv")]
+    if not arqs:
+        raise FileNotFoundError(f"Nenhum arquivo apps_brutos_* em {RAW_DIR}")
+    arq = max(arqs, key=lambda p: (p.stem, p.suffix == ".parquet"))
+    # só as colunas da tabela de revisão (as que existirem no arquivo)
+    if arq.suffix == ".parquet":
+        nomes = pq.read_schema(arq).names
+        df = pd.read_parquet(arq, columns=[c for c in nomes if c in _CAMPOS_LINHA])
+    else:
+        df = ler_csv_arrow(arq, _CAMPOS_LINHA).to_pandas()
+    logger.info(f"Apps brutos carregados: {len(df)} (de {arq.name})")
     return df
 
 
@@ -179,67 +281,26 @@ def gerar_lista_apps_word(df: pd.DataFrame | None = None) -> Path:
     table = doc.add_table(rows=1, cols=n_cols, style="Table Grid")
     table.alignment = WD_TABLE_ALIGNMENT.CENTER
 
+    # grade da tabela com as larguras finais (add_row copia para cada célula)
+    for grid_col, twips in zip(table._tbl.tblGrid.findall(qn("w:gridCol")), _WIDTHS_TWIPS):
+        grid_col.set(qn("w:w"), twips)
+
     # cabeçalho
     hdr = table.rows[0].cells
-    for j, (label, _, w) in enumerate(COLUNAS):
-        _set_col_width(hdr[j], w)
+    for j, (label, _, _) in enumerate(COLUNAS):
+        _set_col_width(hdr[j], _WIDTHS_TWIPS[j])
         _set_cell_text(hdr[j], label,
                        bold=True, size=8,
                        color="FFFFFF",
                        align=WD_ALIGN_PARAGRAPH.CENTER,
                        fill="1A237E")
 
-    # linhas de dados
-    for i, (_, row) in enumerate(df.iterrows(), start=1):
-        cells = table.add_row().cells
-        fill  = "EEF2FF" if i % 2 == 0 else "FFFFFF"
-
-        def val(field, default=""):
-            v = row.get(field, default)
-            return "" if pd.isna(v) else str(v)
-
-        # Nº
-        _set_cell_text(cells[0], str(i),
-                       align=WD_ALIGN_PARAGRAPH.CENTER, fill=fill)
-        # App ID
-        txt_id = val("appId")
-        _set_cell_text(cells[1], txt_id[:50], fill=fill)
-        # Nome
-        _set_cell_text(cells[2], val("title")[:55], fill=fill)
-        # Desenvolvedor
-        _set_cell_text(cells[3], val("developer")[:50], fill=fill)
-        # Categoria
-        _set_cell_text(cells[4], val("genreId"), fill=fill)
-        # Nota
-        score_raw = row.get("score")
-        if pd.notna(score_raw):
-            try:
-                score_str = f"{float(score_raw):.1f}"
-            except (ValueError, TypeError):
-                score_str = val("score")
-        else:
-            score_str = "—"
-        _set_cell_text(cells[5], score_str,
-                       align=WD_ALIGN_PARAGRAPH.CENTER, fill=fill)
-        # Instalações
-        _set_cell_text(cells[6], val("installs") or val("minInstalls"), fill=fill)
-        # Atualizado em
-        _set_cell_text(cells[7],
-                       val("lastUpdatedOn") or val("updated"), fill=fill)
-        # Gratuito
-        free_raw = row.get("free")
-        free_str = "Sim" if str(free_raw).lower() in ("true","1","sim","yes") else (
-                   "Não" if pd.notna(free_raw) else "—")
-        _set_cell_text(cells[8], free_str,
-                       align=WD_ALIGN_PARAGRAPH.CENTER, fill=fill)
-        # Incluir? (em branco, fundo levemente diferente para destacar)
-        _set_cell_text(cells[9], "",
-                       fill="FFF9C4")   # amarelo claro = campo a preencher
-
-    # definir larguras de todas as células
-    for row_obj in table.rows:
-        for j, (_, _, w) in enumerate(COLUNAS):
-            _set_col_width(row_obj.cells[j], w)
+    # linhas de dados — XML das linhas montado como texto e anexado de uma vez
+    # colunas formatadas em lote; uma tupla por linha só para o laço do XML
+    registros = list(zip(*_textos_colunas(df)))
+    xml = _linhas_xml_paralelo(registros)
+    linhas = parse_xml(f"<w:tbl {nsdecls('w')}>{xml}</w:tbl>")
+    table._tbl.extend(list(linhas))
 
     # ── rodapé / instrução extra ──────────────────────────────────────────────
     doc.add_paragraph()
@@ -5,29 +5,30 @@ Fase 4B — Análise qualitativa (PLN): sentimento, temas, LDA e nuvens de palav
 
 import logging, re
 from collections import Counter
+from functools import lru_cache
+from itertools import chain
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
 import matplotlib
 matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import seaborn as sns
 
 from textblob import TextBlob
+from textblob.en import sentiment as _sentimento_en
 from wordcloud import WordCloud
 from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.decomposition import LatentDirichletAllocation
 
 import nltk
-for _res in ("punkt", "punkt_tab", "stopwords"):
-    try:
-        nltk.data.find(f"tokenizers/{_res}" if "punkt" in _res else f"corpora/{_res}")
-    except LookupError:
-        nltk.download(_res, quiet=True)
 from nltk.corpus import stopwords
 
-from src.config import (CLEAN_DIR, GRAFICOS_DIR, TABELAS_DIR,
-                        EIXOS_TEMATICOS, STOPWORDS_EXTRAS)
+from src.config import (CLEAN_DIR, TABELAS_DIR,
+                        EIXOS_TEMATICOS, EIXOS_REGEX, STOPWORDS_EXTRAS)
+from src.graficos import salvar_fig
+from src.leitura_csv import colunas_csv, ler_csv_arrow
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +38,19 @@ plt.rcParams.update({
 })
 sns.set_theme(style="whitegrid", palette="muted")
 
+
+@lru_cache(maxsize=None)
+def _stopwords() -> list[str]:
+    """Stopwords do português (NLTK, baixadas na primeira vez) + extras do
+    projeto; montadas uma vez por processo, fora do import do módulo."""
+    for res in ("punkt", "punkt_tab", "stopwords"):
+        try:
+            nltk.data.find(f"tokenizers/{res}" if "punkt" in res else f"corpora/{res}")
+        except LookupError:
+            nltk.download(res, quiet=True)
+    return sorted(STOPWORDS_EXTRAS | set(stopwords.words("portuguese")))
+
+
 # ── dicionário de ajuste PT-BR ───────────────────────────────────────────────
 _POSITIVAS = {
     "bom","boa","ótimo","ótima","excelente","maravilhoso","maravilhosa",
@@ -53,33 +67,104 @@ _NEGATIVAS = {
 }
 
 
+_RE_URL = re.compile(r"http\S+")
+_RE_NAO_LETRA = re.compile(r"[^a-záàâãéêíóôõúüç\s]")
+_RE_ESPACOS = re.compile(r"\s+")
+
+
 def _limpar(txt: str) -> str:
-    txt = str(txt).lower()
-    txt = re.sub(r"http\S+", "", txt)
-    txt = re.sub(r"[^a-záàâãéêíóôõúüç\s]", " ", txt)
-    return re.sub(r"\s+", " ", txt).strip()
-
-
-def _sentimento(txt: str) -> tuple[str, float]:
-    pol = TextBlob(txt).sentiment.polarity
-    words = set(txt.split())
-    p = len(words & _POSITIVAS)
-    n = len(words & _NEGATIVAS)
-    ajuste = (p - n) * 0.15
-    pol = max(-1, min(1, pol + ajuste))
-    if pol > 0.05:
-        return "Positivo", pol
-    elif pol < -0.05:
-        return "Negativo", pol
-    return "Neutro", pol
-
-
-def _classificar_eixo(txt: str) -> list[str]:
-    eixos = []
-    for eixo, info in EIXOS_TEMATICOS.items():
-        if any(kw in txt for kw in info["keywords"]):
-            eixos.append(eixo)
-    return eixos if eixos else ["Outros"]
+    txt = _RE_URL.sub("", str(txt).lower())
+    txt = _RE_NAO_LETRA.sub(" ", txt)
+    return _RE_ESPACOS.sub(" ", txt).strip()
+
+
+def _limpar_serie(s: pd.Series) -> pd.Series:
+    """_limpar aplicado à coluna inteira pelos métodos .str do pandas
+    (em dtype object, para usar o lower() do Python, como _limpar)."""
+    return (s.astype(str).astype(object).str.lower()
+             .str.replace(_RE_URL, "", regex=True)
+             .str.replace(_RE_NAO_LETRA, " ", regex=True)
+             .str.replace(_RE_ESPACOS, " ", regex=True)
+             .str.strip())
+
+
+# Léxico do TextBlob (en-sentiment.xml) carregado uma vez: polaridade média
+# de cada palavra. Advérbios e negações alteram a palavra seguinte; textos
+# que os contêm ficam com o cálculo completo do TextBlob.
+_POL_EN = {w: d[None][0] for w, d in _sentimento_en.items()}
+_MODIFICA_EN = frozenset(
+    w for w, d in _sentimento_en.items()
+    if any(m in d for m in _sentimento_en.modifiers)
+) | frozenset(_sentimento_en.negations)
+
+
+# reviews curtos se repetem muito ("ótimo", "não funciona"): uma entrada
+# por texto distinto, esvaziado ao fim da fase
+@lru_cache(maxsize=200_000)
+def _polaridade(txt: str) -> float:
+    """Polaridade do TextBlob; direto do léxico quando o texto só tem letras
+    (o tokenizador do TextBlob não separa nada) e nenhum modificador."""
+    palavras = txt.split()
+    if _MODIFICA_EN.isdisjoint(palavras) and "".join(palavras).isalpha():
+        pols = [_POL_EN[w] for w in palavras if w in _POL_EN]
+        return sum(pols) / float(len(pols) or 1)
+    return TextBlob(txt).sentiment.polarity
+
+
+# vocabulário do ajuste PT-BR: +1 para palavra positiva, -1 para negativa
+_VOCAB_AJUSTE = sorted(_POSITIVAS | _NEGATIVAS)
+_PESO_AJUSTE = np.array([1 if w in _POSITIVAS else -1 for w in _VOCAB_AJUSTE])
+
+
+def _sentimentos(textos: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """(rótulo, polaridade) de cada texto: polaridade do TextBlob mais 0.15
+    por palavra positiva e menos 0.15 por negativa (presença, não contagem)."""
+    pol = np.array([_polaridade(t) for t in textos], dtype=float)
+    cv = CountVectorizer(vocabulary=_VOCAB_AJUSTE, binary=True, lowercase=False,
+                         tokenizer=str.split, token_pattern=None)
+    saldo = cv.transform(textos) @ _PESO_AJUSTE
+    pol = np.clip(pol + saldo * 0.15, -1, 1)
+    rotulo = np.select([pol > 0.05, pol < -0.05], ["Positivo", "Negativo"],
+                       default="Neutro")
+    return rotulo, pol
+
+
+def _classificar_eixos(textos: pd.Series) -> pd.Series:
+    """Eixos temáticos de cada texto (["Outros"] se nenhum): uma busca por
+    eixo na coluna inteira, com a regex pré-compilada do config."""
+    nomes = list(EIXOS_REGEX)
+    acertos = np.column_stack([textos.str.contains(rx, regex=True).to_numpy(bool)
+                               for rx in EIXOS_REGEX.values()])
+    return pd.Series([[e for e, a in zip(nomes, linha) if a] or ["Outros"]
+                      for linha in acertos], index=textos.index, name=textos.name,
+                     dtype=object)
+
+
+def _ler_reviews(caminho) -> pd.DataFrame:
+    """Lê os reviews pelo leitor CSV do Arrow (multithread), todas as colunas
+    como texto: só `content` é analisada, e as demais voltam intactas para
+    reviews_anotados.csv (sem inferência de timestamps ou floats). O texto
+    dos reviews tem quebras de linha entre aspas: newlines_in_values."""
+    tipos = dict.fromkeys(colunas_csv(caminho), pa.string())
+    return ler_csv_arrow(caminho, tipos=tipos).to_pandas()
+
+
+# Reviews anotados também em Parquet: na execução seguinte, texto limpo e
+# sentimento são relidos em vez de recalculados, enquanto a entrada não mudar
+_ANOTADOS_PARQUET = TABELAS_DIR / "reviews_anotados.parquet"
+
+
+def _anotados_em_cache(origem) -> pd.DataFrame | None:
+    """Reviews já anotados, se o Parquet veio de `origem` e é mais novo que ela."""
+    try:
+        if _ANOTADOS_PARQUET.stat().st_mtime <= origem.stat().st_mtime:
+            return None
+        df = pd.read_parquet(_ANOTADOS_PARQUET)
+    except (OSError, ValueError):          # ausente ou ilegível
+        return None
+    if df.attrs.get("origem") != origem.name:
+        return None
+    return df.drop(columns=["eixos"], errors="ignore")
 
 
 # ────────────────────────────────────────────────────────────────────────────
@@ -91,26 +176,31 @@ def executar_analise_qualitativa() -> pd.DataFrame:
     # Prefere seleção manual quando existir
     rev_sel = CLEAN_DIR / "reviews_selecionados.csv"
     if rev_sel.exists():
-        df = pd.read_csv(rev_sel, encoding="utf-8-sig")
+        origem = rev_sel
         logger.info("Usando reviews_selecionados.csv (seleção manual)")
     else:
         csv_files = sorted(CLEAN_DIR.glob("reviews_limpos_*.csv"), reverse=True)
         if not csv_files:
             raise FileNotFoundError(f"Sem reviews limpos em {CLEAN_DIR}")
-        df = pd.read_csv(csv_files[0], encoding="utf-8-sig")
-        logger.info(f"Usando {csv_files[0].name}")
-    df = df.dropna(subset=["content"]).copy()
-    logger.info(f"Reviews para PLN: {len(df)}")
+        origem = csv_files[0]
+        logger.info(f"Usando {origem.name}")
 
-    # ── 1. pré-processamento ──────────────────────────────────────────────
-    df["texto_limpo"] = df["content"].apply(_limpar)
-    df = df[df["texto_limpo"].str.len() > 10].copy()
-    logger.info(f"Reviews após limpeza mínima: {len(df)}")
+    df = _anotados_em_cache(origem)
+    if df is not None:
+        logger.info(f"Texto limpo e sentimentos reaproveitados de "
+                    f"{_ANOTADOS_PARQUET.name}: {len(df)} reviews")
+    else:
+        df = _ler_reviews(origem)
+        df = df.dropna(subset=["content"]).copy()
+        logger.info(f"Reviews para PLN: {len(df)}")
 
-    # ── 2. sentimento ─────────────────────────────────────────────────────
-    sent = df["texto_limpo"].apply(_sentimento)
-    df["sentimento"] = sent.apply(lambda x: x[0])
-    df["polaridade"] = sent.apply(lambda x: x[1])
+        # ── 1. pré-processamento ──────────────────────────────────────────
+        df["texto_limpo"] = _limpar_serie(df["content"])
+        df = df[df["texto_limpo"].str.len() > 10].copy()
+        logger.info(f"Reviews após limpeza mínima: {len(df)}")
+
+        # ── 2. sentimento ─────────────────────────────────────────────────
+        df["sentimento"], df["polaridade"] = _sentimentos(df["texto_limpo"])
 
     cnt = df["sentimento"].value_counts()
     pct = (cnt / cnt.sum() * 100).round(1)
@@ -129,7 +219,7 @@ def executar_analise_qualitativa() -> pd.DataFrame:
                  colors=[cores.get(c,"gray") for c in cnt.index])
     axes[1].set_ylabel(""); axes[1].set_title("Proporção", fontweight="bold")
     plt.tight_layout()
-    fig.savefig(GRAFICOS_DIR / "sentimentos.png"); plt.close(fig)
+    salvar_fig(fig, "sentimentos.png")
 
     # polaridade histograma
     fig, ax = plt.subplots()
@@ -138,10 +228,10 @@ def executar_analise_qualitativa() -> pd.DataFrame:
     ax.set_xlabel("Polaridade"); ax.set_ylabel("Frequência")
     ax.set_title("Distribuição da Polaridade dos Sentimentos", fontweight="bold")
     plt.tight_layout()
-    fig.savefig(GRAFICOS_DIR / "distribuicao_polaridade.png"); plt.close(fig)
+    salvar_fig(fig, "distribuicao_polaridade.png")
 
     # ── 3. classificação temática ─────────────────────────────────────────
-    temas = df["texto_limpo"].apply(_classificar_eixo)
+    temas = _classificar_eixos(df["texto_limpo"])
     tema_exploded = temas.explode()
     cnt_t = tema_exploded.value_counts()
     pct_t = (cnt_t / len(df) * 100).round(1)
@@ -155,17 +245,19 @@ def executar_analise_qualitativa() -> pd.DataFrame:
     cnt_t.plot.barh(ax=ax, color=bar_colors, edgecolor="w")
     ax.set_xlabel("Menções"); ax.set_title("Distribuição Temática", fontweight="bold")
     ax.invert_yaxis(); plt.tight_layout()
-    fig.savefig(GRAFICOS_DIR / "distribuicao_tematica.png"); plt.close(fig)
+    salvar_fig(fig, "distribuicao_tematica.png")
 
     # ── 4. sentimento × tema ──────────────────────────────────────────────
-    rows = []
-    for idx, eixos in temas.items():
-        for e in eixos:
-            rows.append({"eixo": e, "sentimento": df.loc[idx, "sentimento"],
-                         "polaridade": df.loc[idx, "polaridade"]})
-    df_tema = pd.DataFrame(rows)
-    if len(df_tema) > 0:
-        cross = pd.crosstab(df_tema["eixo"], df_tema["sentimento"])
+    # tabela de contingência por códigos inteiros (factorize ordenado, como
+    # o crosstab) e um único bincount, sem montar o frame explodido
+    cod_e, eixos = pd.factorize(tema_exploded, sort=True)
+    cod_s, sents = pd.factorize(df["sentimento"].loc[tema_exploded.index], sort=True)
+    if len(cod_e) > 0:
+        contagem = np.bincount(cod_e * len(sents) + cod_s,
+                               minlength=len(eixos) * len(sents))
+        cross = pd.DataFrame(contagem.reshape(len(eixos), len(sents)),
+                             index=pd.Index(eixos, name="eixo"),
+                             columns=pd.Index(sents, name="sentimento"))
         cross.to_csv(TABELAS_DIR / "sentimento_por_tema.csv", encoding="utf-8-sig")
 
         fig, ax = plt.subplots(figsize=(12,7))
@@ -174,62 +266,80 @@ def executar_analise_qualitativa() -> pd.DataFrame:
         ax.set_xlabel("Menções"); ax.set_title("Sentimento por Eixo Temático",
                                                 fontweight="bold")
         ax.invert_yaxis(); ax.legend(title="Sentimento"); plt.tight_layout()
-        fig.savefig(GRAFICOS_DIR / "sentimento_por_tema.png"); plt.close(fig)
+        salvar_fig(fig, "sentimento_por_tema.png")
 
     # ── 5. LDA (topic modeling) ───────────────────────────────────────────
-    stops = list(STOPWORDS_EXTRAS | set(stopwords.words("portuguese")))
     vec = CountVectorizer(max_features=2000, min_df=3, max_df=0.9,
-                          stop_words=stops)
+                          stop_words=_stopwords())
     dtm = vec.fit_transform(df["texto_limpo"])
     n_topics = 5
+    # hiperparâmetros como no estudo (online, batch_size e n_jobs padrão): com
+    # n_jobs > 1 cada fatia do E-step usa seu próprio estado aleatório e os
+    # tópicos passariam a depender do número de núcleos da máquina
     lda = LatentDirichletAllocation(n_components=n_topics, random_state=42,
-                                     max_iter=20, learning_method="online")
-    lda.fit(dtm)
+                                     max_iter=20, learning_method="online",
+                                     evaluate_every=-1)
+    lda.fit(dtm.tocsr())
     feat = vec.get_feature_names_out()
-    topics_out = []
-    for i, comp in enumerate(lda.components_):
-        top_w = [feat[j] for j in comp.argsort()[-10:][::-1]]
-        topics_out.append({"Tópico": f"Tópico {i+1}", "Palavras-chave": ", ".join(top_w)})
+    # top_n palavras de cada tópico (seleção parcial + ordenação das escolhidas),
+    # usadas na tabela e no heatmap
+    top_n = min(10, len(feat))
+    tops = []
+    for comp in lda.components_:
+        idx = np.argpartition(comp, -top_n)[-top_n:]
+        tops.append(idx[np.argsort(-comp[idx])])
+    topics_out = [{"Tópico": f"Tópico {i+1}", "Palavras-chave": ", ".join(feat[idx])}
+                  for i, idx in enumerate(tops)]
     pd.DataFrame(topics_out).to_csv(TABELAS_DIR / "topicos_lda.csv",
                                     index=False, encoding="utf-8-sig")
     logger.info(f"LDA: {n_topics} tópicos extraídos")
 
     # heatmap LDA
     fig, ax = plt.subplots(figsize=(14,6))
-    top_n = 10
-    mat = np.zeros((n_topics, top_n))
-    wlabs = []
-    for i, comp in enumerate(lda.components_):
-        top_idx = comp.argsort()[-top_n:][::-1]
-        if i == 0:
-            wlabs = [feat[j] for j in top_idx]
-        mat[i] = comp[top_idx] / comp.sum()
+    mat = np.array([comp[idx] / comp.sum()
+                    for comp, idx in zip(lda.components_, tops)])
+    wlabs = list(feat[tops[0]])
     sns.heatmap(mat, annot=True, fmt=".3f", cmap="YlOrRd",
                 xticklabels=wlabs,
                 yticklabels=[f"Tópico {i+1}" for i in range(n_topics)], ax=ax)
     ax.set_title("Pesos LDA — Tópico × Palavras", fontweight="bold")
     plt.tight_layout()
-    fig.savefig(GRAFICOS_DIR / "lda_heatmap.png"); plt.close(fig)
+    salvar_fig(fig, "lda_heatmap.png")
 
     # ── 6. nuvem de palavras ──────────────────────────────────────────────
-    for label, sub in [("geral", df), ("positivo", df[df["sentimento"]=="Positivo"]),
-                       ("negativo", df[df["sentimento"]=="Negativo"])]:
-        txt = " ".join(sub["texto_limpo"].tolist())
+    # texto integral de cada recorte, com a tokenização do próprio WordCloud
+    # (sem os cortes de df/vocabulário da DTM do LDA)
+    stops = set(_stopwords())
+    wc = WordCloud(width=1200, height=600, max_words=150,
+                   background_color="white", colormap="viridis",
+                   stopwords=stops, collocations=False)
+    textos, sent = df["texto_limpo"], df["sentimento"]
+    fig = None                             # uma figura só, limpa a cada nuvem
+    for label, sub in [("geral", textos),
+                       ("positivo", textos[sent == "Positivo"]),
+                       ("negativo", textos[sent == "Negativo"])]:
+        txt = " ".join(sub.tolist())
         if len(txt) < 20:
             continue
-        wc = WordCloud(width=1200, height=600, max_words=150,
-                       background_color="white", colormap="viridis",
-                       stopwords=stops, collocations=False).generate(txt)
-        fig, ax = plt.subplots(figsize=(14,7))
+        wc.generate(txt)
+        if fig is None:
+            fig, ax = plt.subplots(figsize=(14,7))
+        else:
+            ax.clear()
         ax.imshow(wc, interpolation="bilinear"); ax.axis("off")
         ax.set_title(f"Nuvem de Palavras — {label.title()}", fontweight="bold")
-        plt.tight_layout()
-        fig.savefig(GRAFICOS_DIR / f"wordcloud_{label}.png"); plt.close(fig)
+        fig.tight_layout()
+        salvar_fig(fig, f"wordcloud_{label}.png", fechar=False)
+    if fig is not None:
+        plt.close(fig)
 
     # ── 7. frequência de palavras ─────────────────────────────────────────
-    all_words = " ".join(df["texto_limpo"]).split()
-    all_words = [w for w in all_words if len(w)>2 and w not in stops]
-    freq = Counter(all_words).most_common(30)
+    # corpus inteiro, sem os cortes de df/vocabulário da DTM do LDA; conta
+    # por review, sem montar a string única, e filtra cada palavra distinta
+    # uma vez (a ordem de 1ª ocorrência, que desempata o most_common, é mantida)
+    cont = Counter(chain.from_iterable(map(str.split, df["texto_limpo"])))
+    freq = Counter({w: c for w, c in cont.items()
+                    if len(w) > 2 and w not in stops}).most_common(30)
     df_freq = pd.DataFrame(freq, columns=["Palavra","Frequência"])
     df_freq.to_csv(TABELAS_DIR / "frequencia_palavras.csv",
                    index=False, encoding="utf-8-sig")
@@ -240,11 +350,17 @@ def executar_analise_qualitativa() -> pd.DataFrame:
     ax.invert_yaxis(); ax.set_xlabel("Frequência")
     ax.set_title("30 Palavras Mais Frequentes", fontweight="bold")
     plt.tight_layout()
-    fig.savefig(GRAFICOS_DIR / "frequencia_palavras.png"); plt.close(fig)
+    salvar_fig(fig, "frequencia_palavras.png")
 
     # ── salvar reviews anotados ───────────────────────────────────────────
     df["eixos"] = temas.apply(lambda x: "; ".join(x) if isinstance(x, list) else str(x))
     df.to_csv(TABELAS_DIR / "reviews_anotados.csv", index=False, encoding="utf-8-sig")
+    df.attrs["origem"] = origem.name
+    try:
+        df.to_parquet(_ANOTADOS_PARQUET, index=False, compression="zstd")
+    except (ValueError, TypeError) as e:   # coluna que o Arrow não converte
+        logger.warning(f"reviews_anotados.parquet não gravado: {e}")
+    _polaridade.cache_clear()
     logger.info("Fase 4B concluída.")
     return df
 
@@ -14,7 +14,9 @@ matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-from src.config import CLEAN_DIR, GRAFICOS_DIR, TABELAS_DIR
+from src.config import CLEAN_DIR, TABELAS_DIR
+from src.graficos import salvar_fig
+from src.leitura_csv import ler_csv_arrow
 
 logger = logging.getLogger(__name__)
 
@@ -25,10 +27,15 @@ plt.rcParams.update({
 sns.set_theme(style="whitegrid", palette="muted")
 
 
-def _carregar() -> tuple[pd.DataFrame, pd.DataFrame]:
+# Colunas dos apps usadas nesta fase; as demais nem chegam a ser lidas
+_COLS_QUANT = ("title", "developer", "tipo_desenvolvedor", "genreId", "score",
+               "instalacoes_num", "ratings", "reviews_count", "updated_dt",
+               "updated", "released")
+
+
+def _carregar() -> pd.DataFrame:
     # Prefere seleção manual quando existir
     sel   = CLEAN_DIR / "apps_selecionados.csv"
-    rev_sel = CLEAN_DIR / "reviews_selecionados.csv"
     if sel.exists():
         csv_a_path = sel
         logger.info("Usando apps_selecionados.csv (seleção manual)")
@@ -39,23 +46,29 @@ def _carregar() -> tuple[pd.DataFrame, pd.DataFrame]:
         csv_a_path = csv_a[0]
         logger.info(f"Usando {csv_a_path.name}")
 
-    df = pd.read_csv(csv_a_path, encoding="utf-8-sig")
-
-    if rev_sel.exists():
-        df_r = pd.read_csv(rev_sel, encoding="utf-8-sig")
-        logger.info("Usando reviews_selecionados.csv")
-    else:
-        csv_r = sorted(CLEAN_DIR.glob("reviews_limpos_*.csv"), reverse=True)
-        df_r = pd.read_csv(csv_r[0], encoding="utf-8-sig") if csv_r else pd.DataFrame()
+    # leitor CSV do Arrow (multithread), só com as colunas que existirem
+    df = ler_csv_arrow(csv_a_path, _COLS_QUANT).to_pandas()
 
-    for c in ["score", "instalacoes_num", "ratings", "reviews_count"]:
+    # contagens no menor inteiro que couber (sem NaN); a nota fica em float64
+    # para não mudar as estatísticas
+    for c, downcast in [("score", None), ("instalacoes_num", "unsigned"),
+                        ("ratings", "integer"), ("reviews_count", "integer")]:
         if c in df.columns:
-            df[c] = pd.to_numeric(df[c], errors="coerce")
+            df[c] = pd.to_numeric(df[c], errors="coerce", downcast=downcast)
     if "updated_dt" in df.columns:
         df["updated_dt"] = pd.to_datetime(df["updated_dt"], errors="coerce")
     elif "updated" in df.columns:
         df["updated_dt"] = pd.to_datetime(df["updated"], unit="s", errors="coerce")
-    return df, df_r
+    return df
+
+
+def _p_valor(r: float, n: int) -> float:
+    """p-valor bicaudal de um coeficiente de correlação r com n pares
+    (estatística t com n - 2 graus de liberdade, como no scipy)."""
+    if abs(r) >= 1:                        # correlação perfeita
+        return 0.0
+    t = r * np.sqrt((n - 2) / (1 - r * r))
+    return 2 * stats.t.sf(abs(t), n - 2)
 
 
 def executar_analise_quantitativa() -> pd.DataFrame:
@@ -64,7 +77,7 @@ def executar_analise_quantitativa() -> pd.DataFrame:
     logger.info("FASE 4A — Análise Quantitativa")
     logger.info("=" * 60)
 
-    df, _ = _carregar()
+    df = _carregar()
 
     # ── métricas de manutenção ────────────────────────────────────────────────
     agora = pd.Timestamp.now()
@@ -91,15 +104,22 @@ def executar_analise_quantitativa() -> pd.DataFrame:
     df_c = df[["dias_desde_atualizacao","score","instalacoes_num","ratings"]].dropna()
     resultados_corr = []
     if len(df_c) >= 5:
-        r, p = stats.pearsonr(df_c["dias_desde_atualizacao"], df_c["score"])
-        rho, p_sp = stats.spearmanr(df_c["dias_desde_atualizacao"], df_c["score"])
+        # uma matriz por método; p-valores a partir de r e n
+        cm = df_c.corr(method="pearson")
+        cm_s = df_c.corr(method="spearman")
+        n = len(df_c)
+        r = cm.loc["dias_desde_atualizacao", "score"]
+        p = _p_valor(r, n)
+        rho = cm_s.loc["dias_desde_atualizacao", "score"]
+        p_sp = _p_valor(rho, n)
         resultados_corr.append({
             "Variáveis": "Dias desde atualização × Score",
             "Pearson (r)": round(r,4), "p-valor (Pearson)": round(p,4),
             "Significativo (p<0.05)": "Sim" if p<0.05 else "Não",
             "Spearman (ρ)": round(rho,4), "p-valor (Spearman)": round(p_sp,4),
         })
-        r2, p2 = stats.pearsonr(df_c["instalacoes_num"], df_c["score"])
+        r2 = cm.loc["instalacoes_num", "score"]
+        p2 = _p_valor(r2, n)
         resultados_corr.append({
             "Variáveis": "Instalações × Score",
             "Pearson (r)": round(r2,4), "p-valor (Pearson)": round(p2,4),
@@ -118,21 +138,19 @@ def executar_analise_quantitativa() -> pd.DataFrame:
         ax.set_ylabel("Nota média (Score)")
         ax.set_title("Correlação: Atualização × Satisfação", fontweight="bold")
         ax.legend(); plt.tight_layout()
-        fig.savefig(GRAFICOS_DIR / "correlacao_atualizacao_score.png")
-        plt.close(fig)
+        salvar_fig(fig, "correlacao_atualizacao_score.png")
 
         # matriz
         fig, ax = plt.subplots(figsize=(8,6))
-        cm = df_c.corr()
         ren = {"dias_desde_atualizacao":"Dias s/ Atualiz.","score":"Score",
                "instalacoes_num":"Instalações","ratings":"Avaliações"}
-        cm.rename(index=ren, columns=ren, inplace=True)
+        cm = cm.rename(index=ren, columns=ren)
         mask = np.triu(np.ones_like(cm, dtype=bool), k=1)
         sns.heatmap(cm, mask=mask, annot=True, fmt=".3f", cmap="RdBu_r",
                     center=0, square=True, ax=ax, linewidths=.5)
         ax.set_title("Matriz de Correlação", fontweight="bold")
         plt.tight_layout()
-        fig.savefig(GRAFICOS_DIR / "matriz_correlacao.png"); plt.close(fig)
+        salvar_fig(fig, "matriz_correlacao.png")
 
     pd.DataFrame(resultados_corr).to_csv(
         TABELAS_DIR / "correlacoes.csv", index=False, encoding="utf-8-sig")
@@ -149,7 +167,7 @@ def executar_analise_quantitativa() -> pd.DataFrame:
                      colors=["#2196F3","#FF9800","#9E9E9E"][:len(cnt)])
         ax.set_ylabel(""); ax.set_title("Tipo de Desenvolvedor", fontweight="bold")
         plt.tight_layout()
-        fig.savefig(GRAFICOS_DIR / "distribuicao_desenvolvedor.png"); plt.close(fig)
+        salvar_fig(fig, "distribuicao_desenvolvedor.png")
 
     # ── 4. gráficos de distribuição ───────────────────────────────────────────
     if "score" in df.columns:
@@ -162,16 +180,16 @@ def executar_analise_quantitativa() -> pd.DataFrame:
         ax.set_xlabel("Score"); ax.set_ylabel("Frequência")
         ax.set_title("Distribuição das Notas", fontweight="bold"); ax.legend()
         plt.tight_layout()
-        fig.savefig(GRAFICOS_DIR / "distribuicao_scores.png"); plt.close(fig)
+        salvar_fig(fig, "distribuicao_scores.png")
 
     if "instalacoes_num" in df.columns:
         fig, ax = plt.subplots()
-        df["instalacoes_num"].dropna().apply(np.log10).hist(
+        np.log10(df["instalacoes_num"].dropna()).hist(
             bins=20, ax=ax, color="#AB47BC", edgecolor="w")
         ax.set_xlabel("log10(Instalações)"); ax.set_ylabel("Frequência")
         ax.set_title("Distribuição de Instalações (log)", fontweight="bold")
         plt.tight_layout()
-        fig.savefig(GRAFICOS_DIR / "distribuicao_instalacoes_log.png"); plt.close(fig)
+        salvar_fig(fig, "distribuicao_instalacoes_log.png")
 
     if "tipo_desenvolvedor" in df.columns and "score" in df.columns:
         fig, ax = plt.subplots()
@@ -179,27 +197,30 @@ def executar_analise_quantitativa() -> pd.DataFrame:
         ax.set_xlabel("Tipo de Desenvolvedor"); ax.set_ylabel("Score")
         ax.set_title("Score por Tipo de Desenvolvedor", fontweight="bold")
         plt.suptitle(""); plt.tight_layout()
-        fig.savefig(GRAFICOS_DIR / "boxplot_score_desenvolvedor.png"); plt.close(fig)
+        salvar_fig(fig, "boxplot_score_desenvolvedor.png")
 
     # ── 5. top apps ───────────────────────────────────────────────────────────
     cols = [c for c in ["title","developer","tipo_desenvolvedor","score",
                         "instalacoes_num","ratings","updated_dt","genreId"]
             if c in df.columns]
-    top = df.nlargest(20, "instalacoes_num")[cols].copy()
-    top["instalacoes_num"] = top["instalacoes_num"].apply(lambda x: f"{x:,.0f}")
+    # só as 20 linhas escolhidas são copiadas, e só nas colunas da tabela
+    # (.copy() explícito: no pandas 2, sem copy-on-write, a atribuição abaixo
+    # sobre um recorte do .loc dispararia SettingWithCopyWarning)
+    top = df.loc[df["instalacoes_num"].nlargest(20).index, cols].copy()
+    top["instalacoes_num"] = top["instalacoes_num"].map("{:,.0f}".format)
     top.to_csv(TABELAS_DIR / "top_20_apps.csv", index=False, encoding="utf-8-sig")
 
     # ── 6. temporal ───────────────────────────────────────────────────────────
     if "updated_dt" in df.columns:
-        dt = df.dropna(subset=["updated_dt"]).copy()
-        dt["mes_upd"] = dt["updated_dt"].dt.to_period("M")
-        cnt_m = dt["mes_upd"].value_counts().sort_index()
+        # contagem direto na coluna de datas, sem copiar o frame filtrado
+        mes_upd = df["updated_dt"].dropna().dt.to_period("M")
+        cnt_m = mes_upd.value_counts().sort_index()
         fig, ax = plt.subplots(figsize=(12,6))
         cnt_m.plot(kind="bar", ax=ax, color="#66BB6A", edgecolor="w")
         ax.set_xlabel("Mês"); ax.set_ylabel("Apps atualizados")
         ax.set_title("Distribuição Temporal das Atualizações", fontweight="bold")
         ax.tick_params(axis="x", rotation=45); plt.tight_layout()
-        fig.savefig(GRAFICOS_DIR / "atualizacoes_por_mes.png"); plt.close(fig)
+        salvar_fig(fig, "atualizacoes_por_mes.png")
 
     logger.info("Fase 4A concluída.")
     return df
@@ -10,16 +10,21 @@ from datetime import datetime
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
 
 from docx import Document
 from docx.shared import Inches, Pt, RGBColor, Cm
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.table import WD_TABLE_ALIGNMENT
-from docx.oxml.ns import qn
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
 
 from src.config import (CLEAN_DIR, GRAFICOS_DIR, TABELAS_DIR,
                         RELATORIO_DIR, DESCRITORES, EIXOS_TEMATICOS,
                         TITULO_PROJETO, SUBTITULO_PROJETO)
+from src.documento import add_paragrafos, celula_xml, salvar_docx
+from src.leitura_csv import abrir_csv_arrow
 
 logger = logging.getLogger(__name__)
 
@@ -41,25 +46,31 @@ def _add_paragraph(doc, text, bold=False, italic=False, font_size=11):
     return p
 
 
+# células no mesmo XML que add_row() + cell.text + formatação do run geravam:
+# cabeçalho em negrito 9pt, dados em 8pt (w:sz em meios-pontos)
+_RPR_CABECALHO = '<w:b/><w:sz w:val="18"/>'
+_RPR_DADOS = '<w:sz w:val="16"/>'
+
+
+def _linha_xml(larguras, textos, rpr: str) -> str:
+    return "<w:tr>" + "".join(
+        celula_xml(t, w, rpr) for w, t in zip(larguras, textos)) + "</w:tr>"
+
+
 def _add_table_from_df(doc, df, max_rows=60):
     """Insere tabela formatada a partir de DataFrame."""
     df = df.head(max_rows).reset_index()
-    table = doc.add_table(rows=1, cols=len(df.columns), style="Light Grid Accent 1")
+    table = doc.add_table(rows=0, cols=len(df.columns), style="Light Grid Accent 1")
     table.alignment = WD_TABLE_ALIGNMENT.CENTER
-    hdr = table.rows[0].cells
-    for i, col in enumerate(df.columns):
-        hdr[i].text = str(col)
-        for p in hdr[i].paragraphs:
-            for run in p.runs:
-                run.bold = True
-                run.font.size = Pt(9)
-    for _, row in df.iterrows():
-        cells = table.add_row().cells
-        for i, val in enumerate(row):
-            cells[i].text = str(val) if pd.notna(val) else ""
-            for p in cells[i].paragraphs:
-                for run in p.runs:
-                    run.font.size = Pt(8)
+    # cabeçalho e linhas de dados montados como texto XML e anexados de uma
+    # vez; to_numpy() dá os mesmos valores (e o mesmo dtype comum) do iterrows
+    larguras = [g.get(qn("w:w")) for g in table._tbl.tblGrid.findall(qn("w:gridCol"))]
+    # textos das células de uma vez só ("" nos nulos), sem teste por célula
+    valores = df.to_numpy()
+    textos = np.where(pd.isna(valores), "", valores.astype(str))
+    xml = _linha_xml(larguras, map(str, df.columns), _RPR_CABECALHO) + "".join(
+        _linha_xml(larguras, linha, _RPR_DADOS) for linha in textos)
+    table._tbl.extend(list(parse_xml(f"<w:tbl {nsdecls('w')}>{xml}</w:tbl>")))
     return table
 
 
@@ -78,6 +89,65 @@ def _safe_read(path: Path, **kwargs) -> pd.DataFrame:
     return pd.DataFrame()
 
 
+# Colunas dos apps usadas pelo relatório (seção 3 e apêndice A)
+_COLS_APPS = {"title", "developer", "tipo_desenvolvedor", "score",
+              "instalacoes_num", "ratings", "genreId"}
+
+
+def _secao_tabela(doc, nome: str, intro: str | None = None, **kwargs) -> pd.DataFrame:
+    """Lê `nome` de TABELAS_DIR e, se houver dados, insere a introdução, a
+    tabela e uma linha em branco; devolve o DataFrame (vazio se não houver)."""
+    df = _safe_read(TABELAS_DIR / nome, **kwargs)
+    if not df.empty:
+        if intro:
+            _add_paragraph(doc, intro)
+        _add_table_from_df(doc, df)
+        doc.add_paragraph()
+    return df
+
+
+def _limpo_mais_recente(prefixo: str, **kwargs) -> pd.DataFrame | None:
+    """CSV limpo mais recente de `prefixo` em CLEAN_DIR (None se não houver)."""
+    arqs = sorted(CLEAN_DIR.glob(f"{prefixo}_*.csv"), reverse=True)
+    return _safe_read(arqs[0], **kwargs) if arqs else None
+
+
+def _contar_registros(path: Path) -> int:
+    """Registros de um CSV (sem o cabeçalho), contados em blocos pelo leitor
+    do Arrow: memória constante e quebras de linha entre aspas respeitadas."""
+    try:
+        leitor = abrir_csv_arrow(
+            path,
+            read_options=pacsv.ReadOptions(skip_rows=1,
+                                           autogenerate_column_names=True),
+            convert_options=pacsv.ConvertOptions(include_columns=["f0"]))
+    except pa.ArrowInvalid:                # só o cabeçalho
+        return 0
+    return sum(lote.num_rows for lote in leitor)
+
+
+# ── frases de interpretação (chave: a condição avaliada) ─────────────────────
+_FRASE_NOTA = {True: "satisfação moderada",                  # média >= 3,5
+               False: "avaliações tendendo a insatisfação"}
+_FRASE_SIMETRIA = {                                          # |média - mediana| < 0,3
+    True: "A proximidade entre média e mediana sugere distribuição relativamente simétrica.",
+    False: "A diferença entre média e mediana sugere assimetria na distribuição."}
+_FRASE_DEV = {                                               # maior == "Comercial"
+    True: ("predomínio do setor privado",
+           "Essa predominância comercial levanta questões sobre a regulação e "
+           "validação científica dos conteúdos de saúde ofertados."),
+    False: ("forte presença governamental/institucional", "")}
+_FRASE_CORRELACAO = {                                        # p < 0,05
+    True: "O resultado é estatisticamente significativo (p < 0,05), "
+          "sugerindo que há associação linear entre as variáveis.",
+    False: "O resultado NÃO foi estatisticamente significativo (p ≥ 0,05), "
+           "indicando que não se pode rejeitar a hipótese nula de ausência de "
+           "correlação linear."}
+_FRASE_SENTIMENTO = {                                        # positivos > negativos
+    True: "A predominância de avaliações positivas sugere satisfação geral dos usuários.",
+    False: "A proporção expressiva de avaliações negativas sinaliza insatisfação relevante."}
+
+
 # ────────────────────────────────────────────────────────────────────────────
 def gerar_relatorio_metodologia(doc: Document):
     """Seção: Metodologia."""
@@ -98,19 +168,17 @@ def gerar_relatorio_metodologia(doc: Document):
         "utilizando scripts em Python (biblioteca google-play-scraper) para "
         "extração programática dos metadados e avaliações públicas dos aplicativos. "
         "A coleta obedeceu aos seguintes descritores de busca:")
-    for d in DESCRITORES:
-        doc.add_paragraph(f"• {d}", style="List Bullet")
+    add_paragrafos(doc, [f"• {d}" for d in DESCRITORES], style="List Bullet")
     _add_paragraph(doc, "Parâmetros de extração:", bold=True)
-    doc.add_paragraph(
+    add_paragrafos(doc, [
         "Metadados técnicos: Versão do SO exigida, data da última atualização "
         "(indicador de manutenção), tamanho do arquivo e desenvolvedor "
-        "(institucional vs. comercial).", style="List Bullet")
-    doc.add_paragraph(
+        "(institucional vs. comercial).",
         "Métricas de desempenho: Número de instalações (escala de adoção) e "
-        "nota média (rating).", style="List Bullet")
-    doc.add_paragraph(
+        "nota média (rating).",
         "Conteúdo gerado pelo usuário: Comentários (reviews) para análise de "
-        "usabilidade e bugs.", style="List Bullet")
+        "usabilidade e bugs.",
+    ], style="List Bullet")
     _add_paragraph(doc,
         "Campos de interesse: appId, title, installs, score, updated, genre, "
         "developer, description, reviews. Para cada aplicativo, foram extraídas "
@@ -118,27 +186,24 @@ def gerar_relatorio_metodologia(doc: Document):
 
     _add_heading(doc, "2.3 Definição do Escopo e Amostragem", 2)
     _add_paragraph(doc, "Critérios de inclusão:", bold=True)
-    doc.add_paragraph(
+    add_paragrafos(doc, [
         "Aplicativos categorizados em 'Medicina' ou 'Saúde e Fitness' que "
         "possuam integração declarada com prontuários eletrônicos ou sistemas "
-        "governamentais;", style="List Bullet")
-    doc.add_paragraph("Mínimo de 1.000 instalações;", style="List Bullet")
-    doc.add_paragraph(
-        "Última atualização dentro dos últimos 24 meses;", style="List Bullet")
-    doc.add_paragraph(
+        "governamentais;",
+        "Mínimo de 1.000 instalações;",
+        "Última atualização dentro dos últimos 24 meses;",
         "Relevância temática verificada por palavras-chave alinhadas a "
-        "Sistemas de Informação em Saúde.", style="List Bullet")
+        "Sistemas de Informação em Saúde.",
+    ], style="List Bullet")
     _add_paragraph(doc, "Critérios de exclusão:", bold=True)
-    doc.add_paragraph(
+    add_paragrafos(doc, [
         "Aplicativos com menos de 1.000 instalações (baixa representatividade);",
-        style="List Bullet")
-    doc.add_paragraph(
         "Aplicativos que não recebam atualizações há mais de 24 meses "
-        "(obsolescência tecnológica);", style="List Bullet")
-    doc.add_paragraph(
+        "(obsolescência tecnológica);",
         "Aplicativos de academias, dietas ou fitness recreativo sem relação "
-        "com SIS clínicos;", style="List Bullet")
-    doc.add_paragraph("Aplicativos duplicados (mesmo appId).", style="List Bullet")
+        "com SIS clínicos;",
+        "Aplicativos duplicados (mesmo appId).",
+    ], style="List Bullet")
 
     _add_heading(doc, "2.4 Classificação de Desenvolvedores", 2)
     _add_paragraph(doc,
@@ -160,10 +225,9 @@ def gerar_relatorio_metodologia(doc: Document):
         "2. Análise Qualitativa (Mineração de Texto): Aplicação de "
         "Processamento de Linguagem Natural (PLN) para categorizar os "
         "comentários nos seguintes eixos:", bold=True)
-    for eixo, info in EIXOS_TEMATICOS.items():
-        doc.add_paragraph(
-            f"• {eixo}: palavras-chave incluem {', '.join(info['keywords'][:8])}...",
-            style="List Bullet")
+    add_paragrafos(doc, [
+        f"• {eixo}: palavras-chave incluem {', '.join(info['keywords'][:8])}..."
+        for eixo, info in EIXOS_TEMATICOS.items()], style="List Bullet")
 
     _add_heading(doc, "2.6 Análise de Sentimentos", 2)
     _add_paragraph(doc,
@@ -195,20 +259,19 @@ def gerar_relatorio_metodologia(doc: Document):
         "o anonimato dos usuários e a utilização estrita de dados agregados "
         "para fins acadêmicos, sem violação dos termos de serviço da plataforma "
         "hospedeira. Nomes de usuários foram substituídos por hashes "
-        "criptográficos (SHA-256 truncado).")
+        "criptográficos (BLAKE2b de 64 bits), e o nome original não é "
+        "armazenado.")
 
 
-def gerar_relatorio_quantitativo(doc: Document):
+def gerar_relatorio_quantitativo(doc: Document, df_apps: pd.DataFrame | None,
+                                 n_rev: int):
     """Seção: Resultados Quantitativos."""
     _add_heading(doc, "3. RESULTADOS — ANÁLISE QUANTITATIVA", 1)
 
     # ── 3.1 amostra ──────────────────────────────────────────────────────
-    csv_a = sorted(CLEAN_DIR.glob("apps_limpos_*.csv"), reverse=True)
-    csv_r = sorted(CLEAN_DIR.glob("reviews_limpos_*.csv"), reverse=True)
-    df_apps = pd.read_csv(csv_a[0], encoding="utf-8-sig") if csv_a else pd.DataFrame()
-    df_rev = pd.read_csv(csv_r[0], encoding="utf-8-sig") if csv_r else pd.DataFrame()
+    if df_apps is None:
+        df_apps = pd.DataFrame()
     n_apps = len(df_apps)
-    n_rev = len(df_rev)
 
     _add_heading(doc, "3.1 Composição da Amostra", 2)
     _add_paragraph(doc,
@@ -217,37 +280,31 @@ def gerar_relatorio_quantitativo(doc: Document):
         f"usuários. A tabela a seguir apresenta os 20 aplicativos com maior "
         f"número de instalações.")
 
-    top = _safe_read(TABELAS_DIR / "top_20_apps.csv")
-    if not top.empty:
-        _add_table_from_df(doc, top)
-        doc.add_paragraph()
+    _secao_tabela(doc, "top_20_apps.csv")
 
     # ── 3.2 estatística descritiva ────────────────────────────────────────
     _add_heading(doc, "3.2 Estatística Descritiva", 2)
-    desc = _safe_read(TABELAS_DIR / "estatistica_descritiva.csv")
+    desc = _secao_tabela(doc, "estatistica_descritiva.csv", intro=(
+        "A tabela abaixo resume as principais estatísticas descritivas das "
+        "variáveis numéricas dos aplicativos incluídos na amostra:"))
     if not desc.empty:
-        _add_paragraph(doc,
-            "A tabela abaixo resume as principais estatísticas descritivas das "
-            "variáveis numéricas dos aplicativos incluídos na amostra:")
-        _add_table_from_df(doc, desc)
-        doc.add_paragraph()
-
-        # interpretação automática
-        if "score" in df_apps.columns:
-            media = df_apps["score"].mean()
-            mediana = df_apps["score"].median()
+        # interpretação automática (agregados das duas colunas numa chamada)
+        num = [c for c in ("score", "instalacoes_num") if c in df_apps.columns]
+        resumo = df_apps[num].agg(["mean", "median", "sum", "max"]) if num else None
+        if "score" in num:
+            media = resumo.at["mean", "score"]
+            mediana = resumo.at["median", "score"]
             _add_paragraph(doc,
                 f"A nota média geral dos aplicativos foi {media:.2f} (mediana: "
-                f"{mediana:.2f}), indicando {'satisfação moderada' if media >= 3.5 else 'avaliações tendendo a insatisfação'} "
-                f"dos usuários. {'A proximidade entre média e mediana sugere distribuição relativamente simétrica.' if abs(media - mediana) < 0.3 else 'A diferença entre média e mediana sugere assimetria na distribuição.'}")
+                f"{mediana:.2f}), indicando {_FRASE_NOTA[media >= 3.5]} "
+                f"dos usuários. {_FRASE_SIMETRIA[abs(media - mediana) < 0.3]}")
 
-        if "instalacoes_num" in df_apps.columns:
-            df_apps["instalacoes_num"] = pd.to_numeric(df_apps["instalacoes_num"], errors="coerce")
-            total = df_apps["instalacoes_num"].sum()
+        if "instalacoes_num" in num:
+            total = resumo.at["sum", "instalacoes_num"]
             _add_paragraph(doc,
                 f"O total acumulado de instalações foi de {total:,.0f}, com alta "
                 f"variabilidade entre os aplicativos (amplitude máxima: "
-                f"{df_apps['instalacoes_num'].max():,.0f}). Isso indica concentração "
+                f"{resumo.at['max', 'instalacoes_num']:,.0f}). Isso indica concentração "
                 f"do mercado em poucos aplicativos dominantes.")
 
     _add_image(doc, GRAFICOS_DIR / "distribuicao_scores.png")
@@ -260,19 +317,18 @@ def gerar_relatorio_quantitativo(doc: Document):
 
     # ── 3.3 desenvolvedores ───────────────────────────────────────────────
     _add_heading(doc, "3.3 Perfil dos Desenvolvedores", 2)
-    dev = _safe_read(TABELAS_DIR / "distribuicao_desenvolvedor.csv")
+    dev = _secao_tabela(doc, "distribuicao_desenvolvedor.csv")
     if not dev.empty:
-        _add_table_from_df(doc, dev)
-        doc.add_paragraph()
         if "tipo_desenvolvedor" in df_apps.columns:
             cnt = df_apps["tipo_desenvolvedor"].value_counts()
             maior = cnt.index[0]
             pct_maior = cnt.iloc[0] / cnt.sum() * 100
+            perfil, ressalva = _FRASE_DEV[maior == "Comercial"]
             _add_paragraph(doc,
                 f"O tipo de desenvolvedor mais frequente é '{maior}' ({pct_maior:.1f}%), "
-                f"o que revela {'predomínio do setor privado' if maior == 'Comercial' else 'forte presença governamental/institucional'} "
+                f"o que revela {perfil} "
                 f"no ecossistema de apps de saúde no Brasil. "
-                f"{'Essa predominância comercial levanta questões sobre a regulação e validação científica dos conteúdos de saúde ofertados.' if maior == 'Comercial' else ''}")
+                f"{ressalva}")
 
     _add_image(doc, GRAFICOS_DIR / "distribuicao_desenvolvedor.png")
     _add_paragraph(doc, "Figura: Distribuição por tipo de desenvolvedor.",
@@ -280,17 +336,16 @@ def gerar_relatorio_quantitativo(doc: Document):
 
     # ── 3.4 correlações ──────────────────────────────────────────────────
     _add_heading(doc, "3.4 Análise de Correlação", 2)
-    corr = _safe_read(TABELAS_DIR / "correlacoes.csv")
+    corr = _secao_tabela(doc, "correlacoes.csv")
     if not corr.empty:
-        _add_table_from_df(doc, corr)
-        doc.add_paragraph()
-        for _, row in corr.iterrows():
-            sig = row.get("Significativo (p<0.05)", "")
-            r_val = row.get("Pearson (r)", 0)
+        # colunas percorridas juntas, sem montar uma Series por linha
+        n = len(corr)
+        for variaveis, r_val, sig in zip(corr.get("Variáveis", [""] * n),
+                                         corr.get("Pearson (r)", [0] * n),
+                                         corr.get("Significativo (p<0.05)", [""] * n)):
             _add_paragraph(doc,
-                f"Para '{row.get('Variáveis','')}': coeficiente de Pearson r = {r_val}. "
-                f"{'O resultado é estatisticamente significativo (p < 0,05), ' if sig == 'Sim' else 'O resultado NÃO foi estatisticamente significativo (p ≥ 0,05), '}"
-                f"{'sugerindo que há associação linear entre as variáveis.' if sig == 'Sim' else 'indicando que não se pode rejeitar a hipótese nula de ausência de correlação linear.'}")
+                f"Para '{variaveis}': coeficiente de Pearson r = {r_val}. "
+                f"{_FRASE_CORRELACAO[sig == 'Sim']}")
 
     _add_image(doc, GRAFICOS_DIR / "correlacao_atualizacao_score.png")
     _add_paragraph(doc, "Figura: Diagrama de dispersão — Atualização × Score.",
@@ -314,23 +369,22 @@ def gerar_relatorio_qualitativo(doc: Document):
 
     # ── 4.1 sentimento ────────────────────────────────────────────────────
     _add_heading(doc, "4.1 Análise de Sentimentos", 2)
-    sent = _safe_read(TABELAS_DIR / "sentimentos.csv")
+    # percentuais já como float no parse: comparados direto, sem float()
+    sent = _secao_tabela(doc, "sentimentos.csv",
+                         dtype={"Percentual (%)": "float64"})
     if not sent.empty:
-        _add_table_from_df(doc, sent)
-        doc.add_paragraph()
         # interpretação
         # Tenta extrair percentuais
         if "Percentual (%)" in sent.columns:
-            pos_row = sent[sent.iloc[:, 0].str.contains("Positivo", na=False)]
-            neg_row = sent[sent.iloc[:, 0].str.contains("Negativo", na=False)]
-            neu_row = sent[sent.iloc[:, 0].str.contains("Neutro", na=False)]
-            p_pos = pos_row["Percentual (%)"].values[0] if len(pos_row) > 0 else 0
-            p_neg = neg_row["Percentual (%)"].values[0] if len(neg_row) > 0 else 0
-            p_neu = neu_row["Percentual (%)"].values[0] if len(neu_row) > 0 else 0
+            # rótulos canônicos gravados pela Fase 4B (Positivo/Neutro/Negativo)
+            pct = dict(zip(sent.iloc[:, 0].astype(str), sent["Percentual (%)"]))
+            p_pos = pct.get("Positivo", 0)
+            p_neg = pct.get("Negativo", 0)
+            p_neu = pct.get("Neutro", 0)
             _add_paragraph(doc,
                 f"A distribuição de sentimentos revelou {p_pos}% de avaliações positivas, "
                 f"{p_neu}% neutras e {p_neg}% negativas. "
-                f"{'A predominância de avaliações positivas sugere satisfação geral dos usuários.' if float(p_pos) > float(p_neg) else 'A proporção expressiva de avaliações negativas sinaliza insatisfação relevante.'} "
+                f"{_FRASE_SENTIMENTO[p_pos > p_neg]} "
                 f"O percentual de avaliações neutras ({p_neu}%) pode indicar "
                 f"comentários descritivos sem juízo de valor claro, ou limitações "
                 f"do classificador de sentimentos para textos curtos em português.")
@@ -344,14 +398,11 @@ def gerar_relatorio_qualitativo(doc: Document):
 
     # ── 4.2 temas ────────────────────────────────────────────────────────
     _add_heading(doc, "4.2 Classificação Temática", 2)
-    tema = _safe_read(TABELAS_DIR / "distribuicao_tematica.csv")
+    tema = _secao_tabela(doc, "distribuicao_tematica.csv", intro=(
+        "As avaliações foram classificadas nos cinco eixos temáticos "
+        "pré-definidos. Um mesmo comentário pode pertencer a mais de um eixo "
+        "se contiver termos de múltiplas categorias."))
     if not tema.empty:
-        _add_paragraph(doc,
-            "As avaliações foram classificadas nos cinco eixos temáticos "
-            "pré-definidos. Um mesmo comentário pode pertencer a mais de um eixo "
-            "se contiver termos de múltiplas categorias.")
-        _add_table_from_df(doc, tema)
-        doc.add_paragraph()
         # interpretação
         if len(tema) > 0:
             top_tema = tema.iloc[0, 0] if tema.iloc[0, 0] != "index" else tema.iloc[0, 1]
@@ -371,14 +422,11 @@ def gerar_relatorio_qualitativo(doc: Document):
 
     # ── 4.3 LDA ──────────────────────────────────────────────────────────
     _add_heading(doc, "4.3 Modelagem de Tópicos (LDA)", 2)
-    lda = _safe_read(TABELAS_DIR / "topicos_lda.csv")
+    lda = _secao_tabela(doc, "topicos_lda.csv", intro=(
+        "O modelo LDA identificou cinco tópicos latentes no corpus de "
+        "avaliações. A tabela apresenta as 10 palavras-chave de maior peso "
+        "para cada tópico:"))
     if not lda.empty:
-        _add_paragraph(doc,
-            "O modelo LDA identificou cinco tópicos latentes no corpus de "
-            "avaliações. A tabela apresenta as 10 palavras-chave de maior peso "
-            "para cada tópico:")
-        _add_table_from_df(doc, lda)
-        doc.add_paragraph()
         _add_paragraph(doc,
             "A interpretação dos tópicos deve ser realizada qualitativamente. "
             "Recomenda-se que o pesquisador analise as palavras-chave de cada "
@@ -403,37 +451,36 @@ def gerar_relatorio_qualitativo(doc: Document):
 
     # ── 4.5 frequência ───────────────────────────────────────────────────
     _add_heading(doc, "4.5 Frequência de Palavras", 2)
-    freq = _safe_read(TABELAS_DIR / "frequencia_palavras.csv")
-    if not freq.empty:
-        _add_paragraph(doc,
-            "As 30 palavras mais frequentes no corpus refletem os temas "
-            "dominantes das avaliações:")
-        _add_table_from_df(doc, freq)
-        doc.add_paragraph()
+    _secao_tabela(doc, "frequencia_palavras.csv", intro=(
+        "As 30 palavras mais frequentes no corpus refletem os temas "
+        "dominantes das avaliações:"))
 
     _add_image(doc, GRAFICOS_DIR / "frequencia_palavras.png")
     _add_paragraph(doc, "Figura: 30 palavras mais frequentes.",
                    italic=True, font_size=9)
 
 
-def gerar_relatorio_apps(doc: Document):
+def gerar_relatorio_apps(doc: Document, df: pd.DataFrame | None):
     """Seção: Lista completa de apps incluídos."""
     _add_heading(doc, "APÊNDICE A — LISTA COMPLETA DE APLICATIVOS INCLUÍDOS", 1)
-    csv_a = sorted(CLEAN_DIR.glob("apps_limpos_*.csv"), reverse=True)
-    if not csv_a:
+    if df is None:
         _add_paragraph(doc, "Dados de aplicativos não encontrados.")
         return
-    df = pd.read_csv(csv_a[0], encoding="utf-8-sig")
     _add_paragraph(doc,
         f"A tabela a seguir lista todos os {len(df)} aplicativos incluídos na "
         f"amostra final, ordenados por número de instalações.")
 
     cols = [c for c in ["title","developer","tipo_desenvolvedor","score",
                         "instalacoes_num","ratings","genreId"] if c in df.columns]
-    df_show = df.sort_values("instalacoes_num", ascending=False)[cols].copy()
+    # o CSV limpo já sai ordenado por instalações (etapa 7 da limpeza): só
+    # reordena se não estiver, e só as 200 linhas exibidas seguem adiante
+    if not df["instalacoes_num"].is_monotonic_decreasing:
+        df = df.sort_values("instalacoes_num", ascending=False)
+    df_show = df.head(200)[cols].copy()     # recebe atribuição logo abaixo
     if "instalacoes_num" in df_show.columns:
-        df_show["instalacoes_num"] = pd.to_numeric(df_show["instalacoes_num"], errors="coerce")
-        df_show["instalacoes_num"] = df_show["instalacoes_num"].apply(lambda x: f"{x:,.0f}" if pd.notna(x) else "")
+        df_show["instalacoes_num"] = (df_show["instalacoes_num"]
+                                      .map("{:,.0f}".format, na_action="ignore")
+                                      .fillna(""))
     rename = {"title":"App","developer":"Desenvolvedor",
               "tipo_desenvolvedor":"Tipo","score":"Nota",
               "instalacoes_num":"Instalações","ratings":"Avaliações",
@@ -488,21 +535,13 @@ def gerar_discussao(doc: Document):
     _add_heading(doc, "5.5 Limitações do Estudo", 2)
     _add_paragraph(doc,
         "Este estudo apresenta as seguintes limitações:")
-    doc.add_paragraph(
+    add_paragrafos(doc, [
         "Análise restrita à Google Play Store, excluindo a Apple App Store;",
-        style="List Bullet")
-    doc.add_paragraph(
         "Limitação do scraper a 200 avaliações por app;",
-        style="List Bullet")
-    doc.add_paragraph(
         "Classificação de sentimentos por dicionário, sem deep learning;",
-        style="List Bullet")
-    doc.add_paragraph(
         "Corte temporal de 24 meses para atualizações;",
-        style="List Bullet")
-    doc.add_paragraph(
         "Resultados sensíveis à lista de descritores de busca.",
-        style="List Bullet")
+    ], style="List Bullet")
 
     _add_heading(doc, "6. CONSIDERAÇÕES FINAIS", 1)
     _add_paragraph(doc,
@@ -535,8 +574,7 @@ def gerar_discussao(doc: Document):
         "HL7 INTERNATIONAL. FHIR (Fast Healthcare Interoperability Resources). "
         "Disponível em: https://www.hl7.org/fhir/. Acesso em: 2026.",
     ]
-    for i, ref in enumerate(refs, 1):
-        doc.add_paragraph(f"[{i}] {ref}")
+    add_paragrafos(doc, [f"[{i}] {ref}" for i, ref in enumerate(refs, 1)])
 
 
 # ════════════════════════════════════════════════════════════════════════════
@@ -614,8 +652,7 @@ def executar_relatorio():
         "Referências",
         "Apêndice A — Lista de Aplicativos",
     ]
-    for item in sumario:
-        doc.add_paragraph(item)
+    add_paragrafos(doc, sumario)
     doc.add_page_break()
 
     # ── 1. introdução ────────────────────────────────────────────────────
@@ -646,19 +683,30 @@ def executar_relatorio():
         "contexto brasileiro.")
 
     # ── seções principais ─────────────────────────────────────────────────
+    # dados limpos lidos uma vez só e compartilhados entre as seções
+    # (dos apps, só as colunas usadas; dos reviews, só a contagem importa)
+    df_apps = _limpo_mais_recente("apps_limpos",
+                                  usecols=lambda c: c in _COLS_APPS,
+                                  dtype={"score": "float64"})
+    if df_apps is not None and "instalacoes_num" in df_apps.columns:
+        # convertido uma vez para as duas seções
+        df_apps["instalacoes_num"] = pd.to_numeric(df_apps["instalacoes_num"],
+                                                   errors="coerce")
+    csv_r = sorted(CLEAN_DIR.glob("reviews_limpos_*.csv"), reverse=True)
+    n_rev = _contar_registros(csv_r[0]) if csv_r else 0
     gerar_relatorio_metodologia(doc)
     doc.add_page_break()
-    gerar_relatorio_quantitativo(doc)
+    gerar_relatorio_quantitativo(doc, df_apps, n_rev)
     doc.add_page_break()
     gerar_relatorio_qualitativo(doc)
     doc.add_page_break()
     gerar_discussao(doc)
     doc.add_page_break()
-    gerar_relatorio_apps(doc)
+    gerar_relatorio_apps(doc, df_apps)
 
     # ── salvar ────────────────────────────────────────────────────────────
     out = RELATORIO_DIR / f"relatorio_infodemiologia_{datetime.now():%Y%m%d_%H%M%S}.docx"
-    doc.save(str(out))
+    salvar_docx(doc, out)
     logger.info(f"Relatório salvo em: {out}")
     return out
 
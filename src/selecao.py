@@ -13,12 +13,19 @@ As fases 4A/4B usam esses arquivos quando existirem.
 """
 
 import logging
+import re
 import shutil
+import sys
+from functools import cache, lru_cache
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
 from src.config import CLEAN_DIR
+from src.leitura_csv import abrir_csv_arrow, colunas_csv, ler_csv_arrow
 
 logger = logging.getLogger(__name__)
 
@@ -39,95 +46,178 @@ ALIAS = {
     "genreId":            "Categoria",
 }
 
+# Largura máxima das linhas da tabela de seleção
+_LARGURA_MAX = 130
+
+# Tokens da seleção: separados por vírgula/espaço; número ou faixa "a-b"
+_RE_SEPARADOR = re.compile(r"[\s,]+")
+_RE_TOKEN = re.compile(r"\+?(\d+)(?:-\+?(\d+))?")
+
 
 # ─────────────────────────────────────────────────────────────────────────────
-def _carregar_limpos() -> tuple[pd.DataFrame, pd.DataFrame]:
-    csv_a = sorted(CLEAN_DIR.glob("apps_limpos_*.csv"), reverse=True)
-    csv_r = sorted(CLEAN_DIR.glob("reviews_limpos_*.csv"), reverse=True)
-    if not csv_a:
+def _ler_reviews(caminho: Path, apps=None) -> pd.DataFrame:
+    """Reviews pelo leitor CSV do Arrow (multithread), todas as colunas como
+    texto: a seleção só filtra por appId e regrava os valores como vieram.
+    O appId chega dicionarizado (category), então o filtro da seleção compara
+    códigos inteiros em vez de fazer hash de cada string. Com `apps`, o filtro
+    é feito ainda na tabela Arrow e só os reviews desses apps viram DataFrame."""
+    tipos = dict.fromkeys(colunas_csv(caminho), pa.string())
+    if "appId" in tipos:
+        tipos["appId"] = pa.dictionary(pa.int32(), pa.string())
+    tabela = ler_csv_arrow(caminho, tipos=tipos)
+    if apps is not None and "appId" in tipos:
+        tabela = tabela.filter(pc.is_in(tabela["appId"],
+                                        value_set=pa.array(sorted(apps), pa.string())))
+    return tabela.to_pandas()
+
+
+def _ler_apps(caminho: Path) -> pd.DataFrame:
+    """Apps pelo leitor CSV do Arrow, com os mesmos tipos que o leitor C do
+    pandas inferiria. Colunas que o Arrow leria como timestamp ficam como
+    texto, para a seleção regravar as datas exatamente como vieram. Se um
+    bloco posterior contradisser a inferência, cai no leitor do pandas."""
+    try:
+        leitor = abrir_csv_arrow(caminho)       # esquema inferido do 1º bloco
+        tipos = {c.name: pa.string() for c in leitor.schema
+                 if pa.types.is_timestamp(c.type) or pa.types.is_date(c.type)}
+        leitor.close()
+        return ler_csv_arrow(caminho, tipos=tipos).to_pandas()
+    except pa.ArrowInvalid:
+        return pd.read_csv(caminho, encoding="utf-8-sig")
+
+
+@lru_cache(maxsize=8)
+def _varrer(padrao: str, mtime_ns: int) -> Path | None:
+    """Arquivo mais recente que casa com `padrao`; o mtime da pasta entra na
+    chave do cache, então qualquer arquivo novo ou removido força nova varredura."""
+    return max(CLEAN_DIR.glob(padrao), default=None)
+
+
+def _mais_recente(padrao: str) -> Path | None:
+    return _varrer(padrao, CLEAN_DIR.stat().st_mtime_ns)
+
+
+def _limpos_mais_recentes() -> tuple[Path, Path | None]:
+    arq_a = _mais_recente("apps_limpos_*.csv")
+    if arq_a is None:
         raise FileNotFoundError(f"Nenhum arquivo apps_limpos_*.csv em {CLEAN_DIR}")
-    df_a = pd.read_csv(csv_a[0], encoding="utf-8-sig")
-    df_r = pd.read_csv(csv_r[0], encoding="utf-8-sig") if csv_r else pd.DataFrame()
+    return arq_a, _mais_recente("reviews_limpos_*.csv")
+
+
+def _salvar_feather(df: pd.DataFrame, caminho_csv: Path) -> None:
+    """Cópia Feather (LZ4) ao lado do CSV da seleção, para o modo 'carregar'
+    recarregá-la sem reinterpretar texto; as fases 4A–6 continuam no CSV."""
+    try:
+        df.to_feather(caminho_csv.with_suffix(".feather"), compression="lz4")
+    except (ValueError, pa.ArrowException) as e:
+        logger.debug(f"  Cópia Feather de {caminho_csv.name} não gravada: {e}")
+
+
+def _ler_selecao(caminho_csv: Path, ler_csv) -> pd.DataFrame:
+    """Seleção salva: a cópia Feather se for pelo menos tão nova quanto o CSV
+    (um CSV regravado ou editado à mão a invalida), senão o próprio CSV."""
+    fth = caminho_csv.with_suffix(".feather")
+    if fth.exists() and fth.stat().st_mtime_ns >= caminho_csv.stat().st_mtime_ns:
+        return pd.read_feather(fth)
+    return ler_csv(caminho_csv)
+
+
+def _carregar_limpos() -> tuple[pd.DataFrame, pd.DataFrame]:
+    arq_a, arq_r = _limpos_mais_recentes()
+    df_a = _ler_apps(arq_a)
+    df_r = _ler_reviews(arq_r) if arq_r else pd.DataFrame()
     return df_a, df_r
 
 
+@cache
+def _largura_linha() -> int:
+    """Largura das linhas separadoras: a do terminal, consultada uma vez por
+    processo, limitada a _LARGURA_MAX."""
+    return min(shutil.get_terminal_size(fallback=(120, 40)).columns, _LARGURA_MAX)
+
+
 def _exibir_tabela(df: pd.DataFrame) -> None:
     """Imprime a tabela numerada de apps no console."""
     cols = [c for c in COLS_EXIBIR if c in df.columns]
-    df_show = df[cols].copy()
-    df_show.rename(columns={c: ALIAS.get(c, c) for c in cols}, inplace=True)
+    # sem .copy() explícito: rename devolve um frame novo e independente em
+    # qualquer pandas >= 2 (cópia no pandas 2, vista copy-on-write no 3), então
+    # as colunas formatadas abaixo nunca tocam o df original nem geram aviso
+    df_show = df[cols].rename(columns={c: ALIAS.get(c, c) for c in cols})
 
-    # formata instalações
+    # formata instalações e nota (ausentes viram "?")
     if "Instalações" in df_show.columns:
-        df_show["Instalações"] = df_show["Instalações"].apply(
-            lambda x: f"{int(x):,}" if pd.notna(x) else "?"
-        )
-    # formata nota
+        inst = df_show["Instalações"].dropna().astype("int64")
+        df_show["Instalações"] = inst.map("{:,}".format).reindex(
+            df_show.index, fill_value="?")
     if "Nota" in df_show.columns:
-        df_show["Nota"] = df_show["Nota"].apply(
-            lambda x: f"{x:.1f}" if pd.notna(x) else "?"
-        )
+        nota = df_show["Nota"].dropna()
+        df_show["Nota"] = nota.map("{:.1f}".format).reindex(
+            df_show.index, fill_value="?")
     # trunca colunas longas
     for col in ["Nome", "Desenvolvedor", "App ID"]:
         if col in df_show.columns:
             df_show[col] = df_show[col].str.slice(0, 40)
 
-    # largura do terminal
-    term_w = shutil.get_terminal_size(fallback=(120, 40)).columns
-    sep = "─" * min(term_w, 130)
+    sep = "─" * _largura_linha()
 
     print()
     print(sep)
     print("  LISTA DE APLICATIVOS APÓS FILTRAGEM")
     print(sep)
 
-    # cabeçalho com índice
+    # cabeçalho com índice; larguras calculadas uma vez por coluna
     idx_w  = 4
-    col_ws = {}
-    for col in df_show.columns:
-        max_len = max(df_show[col].astype(str).map(len).max(), len(col))
-        col_ws[col] = min(max_len + 2, 42)
-
-    header = f"{'Nº':>{idx_w}} "
-    header += " ".join(f"{col:<{col_ws[col]}}" for col in df_show.columns)
+    texto  = df_show.astype(str)
+    # comprimentos de todas as colunas de uma vez (str.len em Arrow compute);
+    # tabela vazia conta 0 e fica com a largura do próprio cabeçalho
+    larguras = texto.apply(lambda s: s.str.len()).max().fillna(0).astype(int)
+    cabecalhos = texto.columns.str.len().to_numpy()
+    col_ws = dict(zip(texto.columns,
+                      (np.minimum(np.maximum(larguras.to_numpy(), cabecalhos) + 2, 42)
+                       .tolist())))
+
+    # um único molde com as larguras já embutidas, montado uma vez por tabela
+    # e usado no cabeçalho e em todas as linhas (tuplas cruas, sem Series)
+    formatar = (f"{{:>{idx_w}}} "
+                + " ".join(f"{{:<{col_ws[col]}}}" for col in texto.columns)).format
+    header = formatar("Nº", *texto.columns)
     print(header)
-    print("─" * min(len(header) + 4, 130))
+    print("─" * min(len(header) + 4, _LARGURA_MAX))
 
-    for i, (_, row) in enumerate(df_show.iterrows(), start=1):
-        line = f"{i:>{idx_w}} "
-        line += " ".join(f"{str(row[col]):<{col_ws[col]}}" for col in df_show.columns)
-        print(line)
+    linhas = [formatar(i, *row)
+              for i, row in enumerate(texto.itertuples(index=False, name=None), start=1)]
+    if linhas:
+        print("\n".join(linhas))
 
     print(sep)
     print(f"  Total: {len(df)} aplicativo(s)")
     print(sep)
 
 
-def _parse_entrada(entrada: str, total: int) -> set[int]:
+def _parse_entrada(entrada: str, total: int) -> tuple[set[int], bool]:
     """
     Converte string de entrada em conjunto de índices 1-based.
     Aceita: '1 3 5', '1,3,5', '2-6', '1-3 7 9-11'
-    Retorna conjunto de índices válidos.
+    Retorna (índices válidos, exata) — `exata` é False se algum token foi
+    ignorado, uma faixa veio invertida ou algo caiu fora de 1..total.
     """
     indices: set[int] = set()
-    # unifica separadores
-    tokens = entrada.replace(",", " ").split()
-    for tok in tokens:
-        if "-" in tok:
-            partes = tok.split("-")
-            if len(partes) == 2:
-                try:
-                    a, b = int(partes[0]), int(partes[1])
-                    indices.update(range(a, b + 1))
-                except ValueError:
-                    print(f"  Entrada ignorada: '{tok}'")
-        else:
-            try:
-                indices.add(int(tok))
-            except ValueError:
-                print(f"  Entrada ignorada: '{tok}'")
-    # limitar ao intervalo válido
-    return {i for i in indices if 1 <= i <= total}
+    exata = True
+    for tok in _RE_SEPARADOR.split(entrada):
+        if not tok:
+            continue
+        m = _RE_TOKEN.fullmatch(tok)
+        if m is None:
+            print(f"  Entrada ignorada: '{tok}'")
+            exata = False
+            continue
+        a = int(m[1])
+        b = int(m[2]) if m[2] else a
+        if not 1 <= a <= b <= total:
+            exata = False
+        # faixa já recortada ao intervalo válido
+        indices.update(range(max(a, 1), min(b, total) + 1))
+    return indices, exata
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -155,8 +245,8 @@ def executar_selecao(modo: str = "interativo") -> tuple[pd.DataFrame, pd.DataFra
     rev_sel_path = CLEAN_DIR / "reviews_selecionados.csv"
     if modo == "carregar":
         if sel_path.exists():
-            df_sel = pd.read_csv(sel_path, encoding="utf-8-sig")
-            df_rev_sel = (pd.read_csv(rev_sel_path, encoding="utf-8-sig")
+            df_sel = _ler_selecao(sel_path, _ler_apps)
+            df_rev_sel = (_ler_selecao(rev_sel_path, _ler_reviews)
                           if rev_sel_path.exists() else pd.DataFrame())
             logger.info(f"  Seleção carregada: {len(df_sel)} apps")
             return df_sel, df_rev_sel
@@ -164,17 +254,26 @@ def executar_selecao(modo: str = "interativo") -> tuple[pd.DataFrame, pd.DataFra
             logger.warning("  Nenhuma seleção prévia encontrada → usando todos")
             modo = "todos"
 
-    df_apps, df_rev = _carregar_limpos()
-    total = len(df_apps)
-
     # ── modo 'todos': pula interação ──────────────────────────────────────
     if modo == "todos":
-        df_apps.to_csv(sel_path, index=False, encoding="utf-8-sig")
-        if not df_rev.empty:
-            df_rev.to_csv(rev_sel_path, index=False, encoding="utf-8-sig")
+        # a seleção é o próprio arquivo limpo: cópia byte a byte, sem
+        # reinterpretar nem reserializar o CSV
+        arq_a, arq_r = _limpos_mais_recentes()
+        shutil.copyfile(arq_a, sel_path)
+        if arq_r:
+            shutil.copyfile(arq_r, rev_sel_path)
+        df_apps, df_rev = _carregar_limpos()
+        total = len(df_apps)
+        if df_rev.empty:                   # sem reviews: como antes, não grava
+            rev_sel_path.unlink(missing_ok=True)
         logger.info(f"  Todos os {total} apps selecionados automaticamente")
         return df_apps, df_rev
 
+    # reviews só são lidos depois da escolha, e apenas os dos apps escolhidos
+    arq_a, arq_r = _limpos_mais_recentes()
+    df_apps = _ler_apps(arq_a)
+    total = len(df_apps)
+
     # ── modo 'interativo' ─────────────────────────────────────────────────
     _exibir_tabela(df_apps)
 
@@ -206,7 +305,7 @@ COMO SELECIONAR:
         # ── modo exclusão ─────────────────────────────────────────────────
         if entrada.lower().startswith("excluir"):
             resto = entrada[len("excluir"):].strip()
-            excluir = _parse_entrada(resto, total)
+            excluir, _ = _parse_entrada(resto, total)
             if not excluir:
                 print("  Nenhum número válido informado para exclusão. Tente novamente.")
                 continue
@@ -219,13 +318,16 @@ COMO SELECIONAR:
             break
 
         # ── modo inclusão explícita ───────────────────────────────────────
-        indices_sel = _parse_entrada(entrada, total)
+        indices_sel, exata = _parse_entrada(entrada, total)
         if not indices_sel:
             print("  Nenhum número válido reconhecido. Tente novamente.")
             continue
         print(f"\n  ✔ {len(indices_sel)} apps selecionados: {sorted(indices_sel)}")
 
-        # confirmação
+        # confirmação só quando algo da entrada foi descartado ou recortado;
+        # entrada exata já é a seleção pretendida
+        if exata:
+            break
         try:
             conf = input("  Confirmar? [S/n]: ").strip().lower()
         except (EOFError, KeyboardInterrupt):
@@ -235,23 +337,32 @@ COMO SELECIONAR:
         print("  Seleção cancelada. Tente novamente.")
 
     # ── filtrar dataframes ────────────────────────────────────────────────
-    idx_list = sorted(indices_sel)
-    df_sel = df_apps.iloc[[i - 1 for i in idx_list]].reset_index(drop=True)
+    # máscara booleana: mantém a ordem da lista sem ordenar os índices
+    mascara = np.zeros(total, dtype=bool)
+    mascara[np.fromiter(indices_sel, dtype=np.intp, count=len(indices_sel)) - 1] = True
+    df_sel = df_apps[mascara].reset_index(drop=True)
 
     ids_validos = set(df_sel["appId"]) if "appId" in df_sel.columns else set()
-    df_rev_sel  = (df_rev[df_rev["appId"].isin(ids_validos)].reset_index(drop=True)
-                   if not df_rev.empty and "appId" in df_rev.columns
-                   else df_rev.copy())
+    if arq_r is None:
+        df_rev_sel = pd.DataFrame()
+    elif len(df_sel) == total:             # todos mantidos: nada a filtrar
+        df_rev_sel = _ler_reviews(arq_r)
+    else:
+        df_rev_sel = _ler_reviews(arq_r, ids_validos)
 
     # exibir resumo dos selecionados
     print()
     print("─" * 60)
     print("  APPS SELECIONADOS PARA ANÁLISE")
     print("─" * 60)
-    for i, (_, row) in enumerate(df_sel.iterrows(), start=1):
-        title = str(row.get("title", row.get("appId", "?")))[:50]
-        nota  = f"{row['score']:.1f}" if pd.notna(row.get("score")) else "?"
-        print(f"  {i:>3}. {title:<50}  nota={nota}")
+    col_nome = next((c for c in ("title", "appId") if c in df_sel.columns), None)
+    nomes = df_sel[col_nome].tolist() if col_nome else ["?"] * len(df_sel)
+    notas = (df_sel["score"].dropna().map("{:.1f}".format)
+             .reindex(df_sel.index, fill_value="?").tolist()
+             if "score" in df_sel.columns else ["?"] * len(df_sel))
+    # uma única escrita no stdout em vez de um print por app
+    sys.stdout.writelines(f"  {i:>3}. {str(nome)[:50]:<50}  nota={nota}\n"
+                          for i, (nome, nota) in enumerate(zip(nomes, notas), start=1))
     print("─" * 60)
     print(f"  {len(df_sel)} apps · {len(df_rev_sel):,} avaliações")
     print("─" * 60)
@@ -259,6 +370,8 @@ COMO SELECIONAR:
     # ── salvar seleção ────────────────────────────────────────────────────
     df_sel.to_csv(sel_path, index=False, encoding="utf-8-sig")
     df_rev_sel.to_csv(rev_sel_path, index=False, encoding="utf-8-sig")
+    _salvar_feather(df_sel, sel_path)
+    _salvar_feather(df_rev_sel, rev_sel_path)
 
     logger.info(f"  Seleção salva: {len(df_sel)} apps, {len(df_rev_sel)} reviews")
     logger.info(f"  → {sel_path}")